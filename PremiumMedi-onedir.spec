@@ -0,0 +1,77 @@
+# -*- mode: python ; coding: utf-8 -*-
+# ერთ-საქაღალდიანი (one-dir) build: გაშვებისას არაფერი იშლება დროებით _MEIPASS-ში
+# აწყობა: pyinstaller PremiumMedi-onedir.spec  ->  dist/PremiumMedi/PremiumMedi.exe
+# გაშვების დროის შედარება: python bench_launch.py dist/PremiumMedi/PremiumMedi.exe dist/PremiumMedi.exe
+
+import os
+import sys
+
+sys.path.insert(0, SPECPATH)
+import precompile_templates
+
+compiled_templates = os.path.join(workpath, 'compiled_templates')
+precompile_templates.compile_templates(compiled_templates)
+
+# warn-PremiumMedi.txt-ში და PYZ-ში მოხვედრილი, მაგრამ გაშვებისას გამოუყენებელი მოდულები
+EXCLUDES = [
+    # სტანდარტული ბიბლიოთეკა
+    'tkinter', 'unittest', 'doctest', 'pydoc', 'pydoc_data', 'pdb', 'xmlrpc', 'curses', 'readline',
+    '_pyrepl', 'lib2to3', 'tomllib',
+    # build-ის ინსტრუმენტები, რომლებიც pkg_resources-ის გავლით ხვდება
+    'setuptools', 'pkg_resources', '_distutils_hack', 'packaging', 'trove_classifiers',
+    # lxml/python-docx-ის არასავალდებულო დამოკიდებულებები
+    'lxml.html', 'lxml.isoschematron', 'lxml.objectify', 'lxml_html_clean', 'cssselect',
+    'bs4', 'BeautifulSoup', 'html5lib', 'cython',
+    # werkzeug/flask-ის არასავალდებულო დამოკიდებულებები
+    'cryptography', 'dotenv', 'asgiref',
+    # reportlab-ის ნაწილები, რომლებსაც PDF-ები არ იყენებს (მხოლოდ platypus + TTF)
+    'reportlab.graphics', 'reportlab.lib.pygments2xpre', 'rlPyCairo', 'pygments', 'PIL',
+]
+
+a = Analysis(
+    ['app.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('templates', 'templates'),
+        ('static', 'static'),
+        (compiled_templates, 'compiled_templates'),
+    ],
+    hiddenimports=['waitress'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='PremiumMedi',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+# UPX გამორთულია: შეკუმშული DLL-ების გაშლა ყოველ გაშვებაზე დროს ხარჯავს
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='PremiumMedi',
+)
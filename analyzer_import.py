@@ -0,0 +1,230 @@
+import codecs
+import csv
+import itertools
+import re
+from collections import namedtuple
+from datetime import datetime
+
+
+# ========== ანალიზატორის შედეგების იმპორტი ==========
+# CSV (ერთი ნიმუში ერთ სტრიქონზე ან ერთი შედეგი ერთ სტრიქონზე) და HL7 v2 ORU ფაილები იკითხება
+# სტრიქონ-სტრიქონ; ანალიზატორის კოდები ფორმის ველებად (cbc_<ABBR>, leuko_<i>, phys_<i>, res_<code>) გადაითარგმნება
+
+ParsedResult = namedtuple('ParsedResult', 'source test_type form unmapped error')
+
+PATIENT_FIELDS = ('first_name', 'last_name', 'age', 'test_date', 'doctor_name')
+# CSV სვეტების სინონიმები -> ფორმის ველი
+COLUMN_ALIASES = {
+    'firstname': 'first_name', 'first_name': 'first_name', 'given': 'first_name', 'სახელი': 'first_name',
+    'lastname': 'last_name', 'last_name': 'last_name', 'surname': 'last_name', 'family': 'last_name',
+    'გვარი': 'last_name',
+    'age': 'age', 'ასაკი': 'age',
+    'date': 'test_date', 'test_date': 'test_date', 'testdate': 'test_date', 'თარიღი': 'test_date',
+    'doctor': 'doctor_name', 'doctor_name': 'doctor_name',
+    'sample': 'sample_id', 'sample_id': 'sample_id', 'sampleid': 'sample_id', 'id': 'sample_id',
+    'test': 'test_type', 'test_type': 'test_type', 'panel': 'test_type',
+    'code': 'code', 'analyte': 'code', 'value': 'value', 'result': 'value',
+}
+# ტესტის მინიშნება (CSV test სვეტი, HL7 OBR-4) -> ტესტის ტიპი
+TEST_ALIASES = {
+    'CBC': 'CBC', 'FBC': 'CBC', 'HEM': 'CBC', 'HEMATOLOGY': 'CBC', 'BL6': 'CBC',
+    'UA': 'Urine', 'URINE': 'Urine', 'URINALYSIS': 'Urine', 'UR7': 'Urine',
+    'CRP': 'CRP', 'HSCRP': 'CRP',
+}
+# ანალიზატორების ალტერნატიული კოდები -> შაბლონის კოდი
+CODE_ALIASES = {
+    'CBC': {'HB': 'HGB', 'RETIC': 'RET', 'RDWCV': 'RDW', 'SOE': 'ESR',
+            'BAND': 'RODNEUT', 'STAB': 'RODNEUT', 'ROD': 'RODNEUT', 'EOS': 'EO', 'BAS': 'BASO',
+            'LYM': 'LYMPH', 'MON': 'MONO', 'PLASMA': 'PLAZ'},
+    'Urine': {'URO': 'UBG', 'BLO': 'BLD', 'ERY': 'BLD', 'SPGR': 'SG',
+              'VOL': 'VOLUME', 'COL': 'COLOR', 'CLA': 'CLARITY', 'APP': 'CLARITY', 'APPEARANCE': 'CLARITY'},
+    'CRP': {},
+}
+# შარდის ცხრილის უაბრევიატურო სტრიქონები (რაოდენობა, ფერი, გამჭვირვალობა)
+URINE_UNNAMED = {'რაოდენობა': 'VOLUME', 'ფერი': 'COLOR', 'გამჭვირვალობა': 'CLARITY'}
+LEUKO_CODE_RE = re.compile(r'\(([^)]*?)\s*%\)')
+
+
+def normalize_code(code):
+    # "Rod NEUT %" -> "RODNEUT", "LYMPH%" -> "LYMPH"; აბსოლუტური რაოდენობა ("LYMPH#") % ველში არ უნდა მოხვდეს
+    code = code.strip().upper()
+    if code.endswith('%'):
+        code = code[:-1]
+    return re.sub(r'[^0-9A-Z#ა-ჿ]', '', code)
+
+
+def build_code_maps(cbc_template, urine_template, crp_template):
+    # {ტესტის ტიპი: {ნორმალიზებული კოდი: ფორმის ველი}} - პირდაპირ შაბლონის dict-ებიდან
+    cbc = {normalize_code(item['abbr']): f"cbc_{item['abbr']}" for item in cbc_template['cbc_analysis']}
+    for idx, item in enumerate(cbc_template['leukocyte_formula']):
+        match = LEUKO_CODE_RE.search(item['parameter'])
+        if match:
+            cbc[normalize_code(match.group(1))] = f'leuko_{idx}'
+    urine = {}
+    for idx, item in enumerate(urine_template['physico_chemical']):
+        code = item['abbr'] or URINE_UNNAMED.get(item['parameter'])
+        if code:
+            urine[normalize_code(code)] = f'phys_{idx}'
+    crp = {normalize_code(item['code']): f"res_{item['code']}" for item in crp_template['test_results']}
+    maps = {'CBC': cbc, 'Urine': urine, 'CRP': crp}
+    for test_type, aliases in CODE_ALIASES.items():
+        for alias, code in aliases.items():
+            if code in maps[test_type]:
+                maps[test_type].setdefault(alias, maps[test_type][code])
+    return maps
+
+
+def classify(codes, hint, code_maps):
+    if hint:
+        test_type = TEST_ALIASES.get(normalize_code(hint))
+        if test_type:
+            return test_type
+    scores = {t: sum(1 for c in codes if c in m) for t, m in code_maps.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else None
+
+
+def build_result(source, patient, results, hint, code_maps):
+    # results: [(კოდი, მნიშვნელობა)] -> ParsedResult ფორმის ველებით
+    codes = [(normalize_code(code), value) for code, value in results if code and value not in (None, '')]
+    test_type = classify([c for c, _ in codes], hint, code_maps)
+    if test_type is None:
+        return ParsedResult(source, None, None, [c for c, _ in codes], "ტესტის ტიპი ვერ დადგინდა")
+    mapping = code_maps[test_type]
+    form = {k: v for k, v in patient.items() if k in PATIENT_FIELDS and v}
+    unmapped = []
+    for code, value in codes:
+        if code in mapping:
+            form[mapping[code]] = value.strip()
+        else:
+            unmapped.append(code)
+    if not any(k not in PATIENT_FIELDS for k in form):
+        return ParsedResult(source, test_type, None, unmapped, "შედეგები ვერ დაემთხვა შაბლონს")
+    return ParsedResult(source, test_type, form, unmapped, None)
+
+
+# ========== CSV ==========
+def parse_csv(lines, code_maps):
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(itertools.chain([first], lines), dialect)
+    header = [h.strip() for h in next(reader)]
+    columns = [COLUMN_ALIASES.get(h.lower().replace(' ', '_'), h) for h in header]
+    rows = ((reader.line_num, dict(zip(columns, row))) for row in reader if any(cell.strip() for cell in row))
+
+    if 'code' in columns and 'value' in columns:
+        # გრძელი ფორმატი: ერთი შედეგი სტრიქონზე, მომდევნო სტრიქონები ერთი ნიმუშისაა
+        def sample_key(item):
+            row = item[1]
+            return row.get('sample_id') or (row.get('last_name'), row.get('first_name'), row.get('test_date'))
+        for _, group in itertools.groupby(rows, key=sample_key):
+            group = list(group)
+            line, row = group[0]
+            results = [(r.get('code', ''), r.get('value', '')) for _, r in group]
+            yield build_result(f'line {line}', row, results, row.get('test_type'), code_maps)
+    else:
+        # ფართო ფორმატი: ერთი ნიმუში სტრიქონზე, ანალიზატორის კოდები სვეტებად
+        meta = set(COLUMN_ALIASES.values())
+        for line, row in rows:
+            results = [(k, v) for k, v in row.items() if k not in meta]
+            yield build_result(f'line {line}', row, results, row.get('test_type'), code_maps)
+
+
+# ========== HL7 v2 (ORU^R01) ==========
+def hl7_date(value):
+    digits = value[:8]
+    try:
+        return datetime.strptime(digits, '%Y%m%d').date()
+    except ValueError:
+        return None
+
+
+def parse_hl7(lines, code_maps):
+    # MSH/PID ახალ პაციენტს იწყებს, OBR - ახალ ანგარიშს, OBX - შედეგს
+    field_sep, comp_sep = '|', '^'
+    patient, dob, report, source = {}, None, None, None
+
+    def flush():
+        if report is None:
+            return None
+        form = dict(patient)
+        form['test_date'] = report['date'].isoformat() if report['date'] else ''
+        if dob and report['date']:
+            years = report['date'].year - dob.year - ((report['date'].month, report['date'].day) < (dob.month, dob.day))
+            form['age'] = str(years)
+        return build_result(report['source'], form, report['results'], report['hint'], code_maps)
+
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line:
+            continue
+        segment = line[:3]
+        if segment == 'MSH':
+            field_sep, comp_sep = line[3], line[4]
+        fields = line.split(field_sep)
+
+        def field(i, component=0):
+            parts = fields[i].split(comp_sep) if i < len(fields) else ['']
+            return parts[component].strip() if component < len(parts) else ''
+
+        if segment in ('MSH', 'PID', 'OBR'):
+            result = flush()
+            if result is not None:
+                yield result
+            report = None
+        if segment == 'PID':
+            patient = {'last_name': field(5, 0), 'first_name': field(5, 1)}
+            dob = hl7_date(field(7))
+        elif segment == 'OBR':
+            source = f'line {number}' + (f' ({field(3)})' if field(3) else '')
+            report = {'source': source, 'hint': field(4, 0) or field(4, 1), 'date': hl7_date(field(7)),
+                      'results': []}
+        elif segment == 'OBX' and report is not None:
+            report['results'].append((field(3, 0) or field(3, 1), field(5)))
+    result = flush()
+    if result is not None:
+        yield result
+
+
+def iter_lines(stream, encoding='utf-8', size=64 * 1024):
+    # ბაიტების ნაკადი -> სტრიქონები ბლოკებად კითხვით; HL7 სეგმენტები ხშირად მხოლოდ \r-ით იყოფა,
+    # ამიტომ ფაილის სტრიქონებად იტერაცია მთელ შეტყობინებას ერთ "სტრიქონად" წაიკითხავდა
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    tail = ''
+    while True:
+        block = stream.read(size)
+        text = tail + decoder.decode(block, final=not block)
+        lines = text.splitlines()
+        tail = lines.pop() if block and lines and not text.endswith(('\r', '\n')) else ''
+        yield from lines
+        if not block:
+            return
+
+
+def detect_format(first_line):
+    return 'hl7' if first_line.lstrip('\ufeff').startswith('MSH') else 'csv'
+
+
+def parse(lines, code_maps, fmt=None):
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return iter(())
+    lines = itertools.chain([first.lstrip('\ufeff')], lines)
+    parser = parse_hl7 if (fmt or detect_format(first)) == 'hl7' else parse_csv
+    return parser(lines, code_maps)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
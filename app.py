@@ -1,15 +1,32 @@
-import webbrowser
+import time
+
+STARTED_AT = time.perf_counter()
+
 import os
 import sys
+import functools
+import hashlib
 import threading
 import json
-from flask import Flask, render_template, request, send_file, Response, jsonify
-from docx import Document
-from docx.shared import Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+import base64
+import patient_store
+import ooxml_render
+import analyzer_import
+import inbox_watcher
+import doc_cache
+import trends
+import persist_queue
+import atexit
+import argparse
+import multiprocessing
+import wsgi_server
+import launcher
+from flask import (Flask, Blueprint, render_template, stream_template, request, send_file, Response, jsonify, url_for,
+                   has_request_context)
+from jinja2 import ChoiceLoader, ModuleLoader
 import io
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 
@@ -25,48 +42,96 @@ def get_template_folder():
     return os.path.join(get_base_path(), 'templates')
 
 
+def get_static_folder():
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'static')
+    return os.path.join(get_base_path(), 'static')
+
+
+def get_compiled_templates_folder():
+    # ერთ-საქაღალდიან build-ში შაბლონები წინასწარ კომპილირებულია (precompile_templates.py)
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'compiled_templates')
+    return None
+
+
 def get_saved_docs_folder():
     folder = os.path.join(get_base_path(), 'saved_docs')
     os.makedirs(folder, exist_ok=True)
     return folder
 
 
+def get_persist_jobs_folder():
+    # სტატუს-ფაილები მხოლოდ --workers რეჟიმშია საჭირო; ერთ პროცესში სტატუსი მეხსიერებაშია
+    # და ბეჭდვის მოთხოვნა დისკზე არაფერს წერს
+    if not wsgi_server.is_worker_process():
+        return None
+    folder = os.path.join(get_base_path(), 'persist_jobs')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def get_inbox_folder():
+    return os.path.join(get_base_path(), 'inbox')
+
+
 def get_database_path():
     return os.path.join(get_base_path(), 'patients_db.json')
 
 
-app = Flask(__name__, template_folder=get_template_folder())
+def get_sqlite_path():
+    return os.path.join(get_base_path(), 'patients_db.sqlite3')
+
+
+# ბაზის ძრავი: 'sqlite' (ნაგულისხმევი), 'journal' (JSON სნეპშოტი + ჟურნალი) ან 'json' (ძველი, მთლიანი ფაილი)
+DB_BACKEND = os.environ.get('PREMIUMMEDI_DB_BACKEND', 'sqlite')
+
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+
+class PremiumMediFlask(Flask):
+    def get_send_file_max_age(self, filename):
+        # სტატიკური ფაილები (ბეჭდვის CSS) ვერსიით მიეწოდება - ბრაუზერს შეუძლია წელიწადი დაიქეშოს;
+        # send_file-ის სხვა პასუხები (პაციენტის DOCX, ZIP) არ ქეშირდება
+        if has_request_context() and request.endpoint == 'static':
+            return STATIC_MAX_AGE
+        return None
+
+
+app = PremiumMediFlask(__name__, template_folder=get_template_folder(), static_folder=get_static_folder())
+compiled_templates = get_compiled_templates_folder()
+if compiled_templates and os.path.isdir(compiled_templates):
+    # Jinja პარსინგი/კომპილაცია გაშვებისას აღარ ხდება; წყარო შაბლონები რჩება სარეზერვოდ
+    app.jinja_env.loader = ChoiceLoader([ModuleLoader(compiled_templates), app.jinja_env.loader])
+
+# ყოველი ტესტის ტიპი ცალკე blueprint-ია; run_all.py ყველას ერთ პროცესში, ერთ პორტზე ემსახურება
+main_bp = Blueprint('main', __name__)
+cbc_bp = Blueprint('cbc', __name__)
+urine_bp = Blueprint('urine', __name__)
+crp_bp = Blueprint('crp', __name__)
+trop_bp = Blueprint('trop', __name__)
+visit_bp = Blueprint('visit', __name__)
+BLUEPRINTS = [main_bp, cbc_bp, urine_bp, crp_bp, trop_bp, visit_bp]
 
 
 # ========== პაციენტების ბაზა ==========
-def load_database():
-    db_path = get_database_path()
-    if os.path.exists(db_path):
-        with open(db_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"patients": []}
-
-
-def save_database(data):
-    db_path = get_database_path()
-    with open(db_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-
-def add_patient_record(first_name, last_name, age, test_type, filename, test_date):
-    db = load_database()
-    record = {
-        "id": len(db["patients"]) + 1,
-        "first_name": first_name,
-        "last_name": last_name,
-        "age": age,
-        "test_type": test_type,
-        "filename": filename,
-        "test_date": test_date,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    }
-    db["patients"].append(record)
-    save_database(db)
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                store = patient_store.open_store(DB_BACKEND, get_database_path(), get_sqlite_path())
+                _registry = patient_store.RegistryCache(store)
+    return _registry
+
+
+def add_patient_record(first_name, last_name, age, test_type, filename, test_date, results=None):
+    return get_registry().add(patient_store.new_record(first_name, last_name, age, test_type, filename, test_date,
+                                                       results))
 
 
 # ========== შაბლონები ==========
@@ -162,49 +227,179 @@ TROPONIN_TEMPLATE = {
 
 
 def set_cell_shading(cell, color):
+    from docx.oxml.ns import qn
+    from docx.oxml import OxmlElement
     shading_elm = OxmlElement('w:shd');
     shading_elm.set(qn('w:fill'), color);
     cell._tc.get_or_add_tcPr().append(shading_elm)
 
 
+# ========== DOCX ჩონჩხები ==========
+# თითოეული ტესტის სტატიკური ნაწილი (ჰედერი, ცხრილები, ნორმები) ერთხელ იგება ცარიელი
+# ფორმით და ბაიტებად ინახება; მოთხოვნისას ივსება მხოლოდ პაციენტისა და შედეგების run-ები
+DOCX_SKELETONS = {}
+
+
+def get_docx_skeleton(test_type):
+    skeleton = DOCX_SKELETONS.get(test_type)
+    if skeleton is None:
+        buffer = io.BytesIO()
+        DOCX_BUILDERS[test_type]({}).save(buffer)
+        skeleton = DOCX_SKELETONS[test_type] = buffer.getvalue()
+    return skeleton
+
+
+def build_docx_skeletons():
+    for test_type in DOCX_BUILDERS:
+        if DOCX_RENDERER.get(test_type) == 'ooxml':
+            get_ooxml_template(test_type)
+        else:
+            get_docx_skeleton(test_type)
+
+
+def load_docx_skeleton(test_type):
+    # python-docx მძიმე იმპორტია - იტვირთება პირველი გამოყენებისას (ან warm_up-ში), არა გაშვებისას
+    from docx import Document
+    return Document(io.BytesIO(get_docx_skeleton(test_type)))
+
+
+def fill_patient_info(doc, form_data, padding="   "):
+    runs = doc.paragraphs[3].runs
+    runs[1].text = f"{form_data.get('first_name', '')} {form_data.get('last_name', '')}, {form_data.get('age', '')} წ.{padding}"
+    runs[3].text = form_data.get('test_date', '')
+
+
+def fill_column(table, col, values):
+    # ჩონჩხში ცარიელ უჯრებსაც აქვს ფორმატირებული run - ვცვლით მხოლოდ ტექსტს
+    for cell, value in zip(table.columns[col].cells[1:], values):
+        cell.paragraphs[0].runs[0].text = value
+
+
 # ========== ROUTES ==========
-@app.route('/')
+@main_bp.route('/')
 def index(): return render_template('index.html')
 
 
-@app.route('/search')
+SEARCH_PAGE_SIZE = 50
+SEARCH_MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(record):
+    raw = json.dumps([record["created_at"], record["id"]]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return (str(created_at), int(record_id))
+    except (ValueError, TypeError):
+        return None
+
+
+@main_bp.route('/search')
 def search():
-    query = request.args.get('q', '').lower().strip()
-    db = load_database()
-    results = [p for p in db["patients"] if query in p["last_name"].lower() or query in p["first_name"].lower()]
-    return jsonify({"results": sorted(results, key=lambda x: x["created_at"], reverse=True)})
+    query = patient_store.name_key(request.args.get('q', ''))
+    limit = min(max(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), 1), SEARCH_MAX_PAGE_SIZE)
+    cursor = request.args.get('cursor')
+    before = decode_cursor(cursor) if cursor else None
+    if cursor and before is None:
+        return jsonify({"error": "invalid cursor"}), 400
 
+    # ერთით მეტს ვიღებთ, რომ ვიცოდეთ არის თუ არა შემდეგი გვერდი
+    page = get_registry().search(query, limit=limit + 1, before=before)
+    next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+    page = page[:limit]
 
-@app.route('/download/<filename>')
-def download_file(filename):
-    path = os.path.join(get_saved_docs_folder(), filename)
-    return send_file(path, as_attachment=True) if os.path.exists(path) else ("Not Found", 404)
+    if request.args.get('format') == 'ndjson':
+        # ჩანაწერები ხაზ-ხაზად, ბოლოს - შემდეგი გვერდის კურსორი
+        def generate():
+            for record in page:
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+            yield json.dumps({"next_cursor": next_cursor}) + "\n"
+        return Response(generate(), mimetype='application/x-ndjson')
 
+    return jsonify({"results": page, "next_cursor": next_cursor})
 
-@app.route('/delete/<int:record_id>', methods=['POST'])
+
+def no_store(response):
+    # პაციენტის დოკუმენტი არც ბრაუზერის ქეშში, არც შუალედურ პროქსიზე არ უნდა დარჩეს
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+
+@main_bp.route('/download/<filename>')
+def download_file(filename):
+    # saved_docs მხოლოდ ქეშია: გამოძევებული დოკუმენტი შენახული შედეგებიდან თავიდან იგება
+    cache = get_doc_cache()
+    docx_bytes = cache.get(filename)
+    if docx_bytes is None:
+        record = get_registry().by_filename(filename)
+        docx_bytes = regenerate_document(record) if record is not None else None
+        if docx_bytes is None:
+            return ("Not Found", 404)
+        cache.put(filename, docx_bytes)
+    return no_store(send_file(io.BytesIO(docx_bytes), as_attachment=True, download_name=filename))
+
+
+@main_bp.route('/delete/<int:record_id>', methods=['POST'])
 def delete_record(record_id):
-    db = load_database()
-    for i, p in enumerate(db["patients"]):
-        if p["id"] == record_id:
-            path = os.path.join(get_saved_docs_folder(), p["filename"])
-            if os.path.exists(path): os.remove(path)
-            db["patients"].pop(i);
-            save_database(db);
-            return jsonify({"success": True})
-    return jsonify({"success": False})
+    p = get_registry().delete(record_id)
+    if p is None:
+        return jsonify({"success": False})
+    path = os.path.join(get_saved_docs_folder(), p["filename"])
+    if os.path.exists(path): os.remove(path)
+    return jsonify({"success": True})
+
+
+# ========== ბეჭდვის გვერდები ==========
+# ბეჭდვის HTML Jinja შაბლონებიდან (autoescape) ნაწილ-ნაწილ იგზავნება, CSS კი static/css-დან ცალკე ქეშირდება
+# test_type -> (შაბლონის dict, ანგარიშის Jinja ნაწილი, CSS ფაილი)
+PRINT_VIEWS = {
+    'CBC': (CBC_TEMPLATE, 'print_cbc_report.html', 'print_cbc.css'),
+    'Urine': (URINE_TEMPLATE, 'print_urine_report.html', 'print_urine.css'),
+    'CRP': (CRP_TEMPLATE, 'print_crp_report.html', 'print_crp.css'),
+    'Troponin': (TROPONIN_TEMPLATE, 'print_troponin_report.html', 'print_troponin.css'),
+}
+PRINT_TEMPLATES = ['print_page.html'] + [view[1] for view in PRINT_VIEWS.values()]
+
+
+@functools.lru_cache(maxsize=None)
+def asset_version(filename):
+    # შინაარსის ჰეში URL-ში: ფაილის შეცვლისას მისამართიც იცვლება და ძველი ქეში აღარ გამოიყენება
+    with open(os.path.join(app.static_folder, filename), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:10]
+
+
+def asset_url(filename):
+    return url_for('static', filename=filename, v=asset_version(filename))
+
+
+@app.context_processor
+def inject_asset_url():
+    return {'asset_url': asset_url}
+
+
+def print_response(reports, headers=None):
+    # reports: [(test_type, form_data), ...] - ყოველი ანგარიში ცალკე ფურცელზე, მაგრამ ერთ გვერდზე და ერთ ბეჭდვაში
+    views = [PRINT_VIEWS[test_type] for test_type, _ in reports]
+    context = {
+        'title': ' + '.join(dict.fromkeys(test_type for test_type, _ in reports)),
+        'reports': [{'template': view[0], 'include': view[1], 'fd': fd} for view, (_, fd) in zip(views, reports)],
+        'stylesheets': ['print.css'] + list(dict.fromkeys(view[2] for view in views)),
+    }
+    return Response(stream_template('print_page.html', **context), mimetype='text/html', headers=headers or {})
 
 
 # ========== CBC FUNCTIONS ==========
-@app.route('/cbc')
+@cbc_bp.route('/cbc')
 def cbc_form(): return render_template('form_cbc.html', template=CBC_TEMPLATE)
 
 
-def create_cbc_document(form_data):
+def build_cbc_document(form_data):
+    from docx import Document
+    from docx.shared import Pt, Cm, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
 
     # მარჯინები - კომპაქტური
@@ -334,42 +529,42 @@ def create_cbc_document(form_data):
     return doc
 
 
-@app.route('/cbc/print', methods=['POST'])
+def fill_cbc_document(doc, form_data):
+    fill_patient_info(doc, form_data)
+    fill_column(doc.tables[0], 2, [form_data.get(f"cbc_{item['abbr']}", '') for item in CBC_TEMPLATE["cbc_analysis"]])
+    fill_column(doc.tables[1], 1, [form_data.get(f'leuko_{idx}', '') for idx in range(len(CBC_TEMPLATE["leukocyte_formula"]))])
+    morph = doc.paragraphs[6].runs
+    morph[1].text = form_data.get('erythrocyte_morphology', '') + "  "
+    morph[3].text = form_data.get('leukocyte_morphology', '')
+    doc.paragraphs[7].runs[1].text = form_data.get('doctor_name', '') + "    "
+
+
+def create_cbc_document(form_data):
+    doc = load_docx_skeleton('CBC')
+    fill_cbc_document(doc, form_data)
+    return doc
+
+
+@cbc_bp.route('/cbc/print', methods=['POST'])
 def cbc_print_route():
     fd = request.form.to_dict()
     # 1. შენახვა
-    doc = create_cbc_document(fd)
-    fname = f"CBC_{fd.get('last_name')}_{datetime.now().strftime('%H%M%S')}.docx"
-    fpath = os.path.join(get_saved_docs_folder(), fname)
-    doc.save(fpath)
-    add_patient_record(fd.get('first_name'), fd.get('last_name'), fd.get('age'), 'CBC', fname, fd.get('test_date'))
+    fname = report_filename('CBC', fd)
+    job_id = queue_report('CBC', fd, fname)
 
     # 2. ბეჭდვის HTML
-    html = f'''<!DOCTYPE html><html><head><meta charset="UTF-8"><title>CBC</title>
-<style>@page{{size:A4;margin:10mm}}body{{font-family:Arial,sans-serif;padding:10px;font-size:15px}}
-h1{{color:green;text-align:center;font-size:18px}}h2{{text-align:center;font-size:16px}}
-table{{width:100%;border-collapse:collapse;margin:10px 0}}th,td{{border:1px solid #ddd;padding:6px;text-align:left;font-size:13px}}th{{background:#D9E2F3}}.leuko th{{background:#E2F0D9}}</style></head><body>
-<h1>PREMIUM MEDI / პრემიუმ მედი</h1><p style="text-align:center">ტელ: 558-27-55-51</p><h2>BL6 - სისხლის საერთო ანალიზი CBC</h2>
-<p><b>პაციენტი:</b> {fd.get('first_name')} {fd.get('last_name')}, {fd.get('age')} წ. &nbsp;&nbsp; <b>თარიღი:</b> {fd.get('test_date')}</p>
-<table><tr><th>აბრევ.</th><th>პარამეტრი</th><th>შედეგი</th><th>ნორმა</th><th>ერთ.</th></tr>'''
-    for item in CBC_TEMPLATE["cbc_analysis"]:
-        abbr = item['abbr']
-        html += f"<tr><td>{abbr}</td><td>{item['parameter']}</td><td><b>{fd.get(f'cbc_{abbr}', '')}</b></td><td>{item['reference_range']}</td><td>{item['unit']}</td></tr>"
-    html += '</table><table class="leuko"><tr><th>პარამეტრი</th><th>შედეგი</th><th>ნორმა</th></tr>'
-    for idx, item in enumerate(CBC_TEMPLATE["leukocyte_formula"]):
-        html += f"<tr><td>{item['parameter']}</td><td><b>{fd.get(f'leuko_{idx}', '')}</b></td><td>{item['norm']}</td></tr>"
-    html += f'''</table><p><b>მორფოლოგია:</b> {fd.get('erythrocyte_morphology', '')} | {fd.get('leukocyte_morphology', '')}</p>
-<p><b>შეასრულა:</b> {fd.get('doctor_name', '')} &nbsp;&nbsp; ხელმოწერა: __________</p>
-<script>window.onload=function(){{setTimeout(function(){{window.print()}},500)}}</script></body></html>'''
-    return Response(html, mimetype='text/html')
+    return print_response([('CBC', fd)], {'X-Persist-Job': job_id})
 
 
 # ========== URINE FUNCTIONS ==========
-@app.route('/urine')
+@urine_bp.route('/urine')
 def urine_form(): return render_template('form_urinalysis.html', template=URINE_TEMPLATE)
 
 
-def create_urine_document(form_data):
+def build_urine_document(form_data):
+    from docx import Document
+    from docx.shared import Pt, Cm, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
     for s in doc.sections: s.top_margin = Cm(0.5); s.bottom_margin = Cm(0.5); s.left_margin = Cm(
         1.0); s.right_margin = Cm(1.0)
@@ -479,74 +674,40 @@ def create_urine_document(form_data):
     return doc
 
 
-@app.route('/urine/print', methods=['POST'])
-def urine_print_route():
-    fd = request.form.to_dict()
-    ph = ', '.join(URINE_TEMPLATE['header']['phones'])
-
-    # HTML-ის დასაწყისი
-    html = f'''<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Urine</title>
-<style>@page{{size:A4;margin:10mm}}body{{font-family:Arial,sans-serif;padding:10px;font-size:13px}}
-h1{{color:green;text-align:center;font-size:16px}}h2{{text-align:center;font-size:14px}}
-table{{width:100%;border-collapse:collapse;margin:5px 0}}
-th,td{{border:1px solid #ddd;padding:4px;text-align:left;font-size:11px}}
-th{{background:#FFF2CC}} .micro th{{background:#E2EFDA}} .other th{{background:#DDEBF7}}
-h3{{font-size:12px;margin:10px 0 5px 0}}</style></head><body>
-<h1>PREMIUM MEDI / პრემიუმ მედი</h1><p style="text-align:center">{URINE_TEMPLATE['header']['subtitle']} | ტელ: {ph}</p>
-<h2>{URINE_TEMPLATE['test_info']['code']} - {URINE_TEMPLATE['test_info']['name']}</h2>
-<p><b>პაციენტი:</b> {fd.get('first_name')} {fd.get('last_name')}, {fd.get('age')} წ. &nbsp;&nbsp; <b>თარიღი:</b> {fd.get('test_date')}</p>
-
-<h3>ფიზიკო-ქიმიური თვისებები</h3>
-<table><tr><th>აბრევ.</th><th>პარამეტრი</th><th>შედეგი</th><th>ნორმა</th><th>ერთ.</th></tr>'''
-
-    # 1. ფიზიკო-ქიმიური
-    for idx, item in enumerate(URINE_TEMPLATE["physico_chemical"]):
-        html += f"<tr><td>{item['abbr']}</td><td>{item['parameter']}</td><td><b>{fd.get(f'phys_{idx}', '')}</b></td><td>{item['norm']}</td><td>{item['unit']}</td></tr>"
-    html += '</table>'
-
-    # 2. მიკროსკოპია
-    html += '<h3>მიკროსკოპია</h3><table class="micro"><tr><th>ეპითელიუმი</th><th>შედეგი</th><th>ცილინდრები</th><th>შედეგი</th></tr>'
-    epi = URINE_TEMPLATE["microscopy"]["epithelium"]
-    cyl = URINE_TEMPLATE["microscopy"]["cylinders"]
-    for i in range(max(len(epi), len(cyl))):
-        el = epi[i]['label'] if i < len(epi) else ''
-        ev = fd.get(f"epi_{epi[i]['key']}", '') if i < len(epi) else ''
-        cl = cyl[i]['label'] if i < len(cyl) else ''
-        cv = fd.get(f"cyl_{cyl[i]['key']}", '') if i < len(cyl) else ''
-        html += f"<tr><td>{el}</td><td><b>{ev}</b></td><td>{cl}</td><td><b>{cv}</b></td></tr>"
-    html += '</table>'
-
-    # 3. სხვა მონაცემები (სწორედ ეს ნაწილი გაკლდათ)
-    html += '<h3>სხვა მონაცემები</h3><table class="other"><tr><th>პარამეტრი</th><th>შედეგი</th><th>პარამეტრი</th><th>შედეგი</th></tr>'
+def fill_urine_document(doc, form_data):
+    fill_patient_info(doc, form_data)
+    fill_column(doc.tables[0], 2, [form_data.get(f'phys_{idx}', '') for idx in range(len(URINE_TEMPLATE["physico_chemical"]))])
+    epi, cyl = URINE_TEMPLATE["microscopy"]["epithelium"], URINE_TEMPLATE["microscopy"]["cylinders"]
+    fill_column(doc.tables[1], 1, [form_data.get(f"epi_{e['key']}", '') for e in epi])
+    fill_column(doc.tables[1], 3, [form_data.get(f"cyl_{c['key']}", '') for c in cyl])
     others = URINE_TEMPLATE["microscopy"]["others"]
-    for i in range(0, len(others), 2):
-        p1 = others[i]['parameter']
-        v1 = fd.get(f"other_{others[i]['key']}", '')
+    fill_column(doc.tables[2], 1, [form_data.get(f"other_{o['key']}", '') for o in others[0::2]])
+    fill_column(doc.tables[2], 3, [form_data.get(f"other_{o['key']}", '') for o in others[1::2]])
+    doc.paragraphs[7].runs[0].text = \
+        f"აპარატურა: {URINE_TEMPLATE['footer']['equipment']}  შეასრულა: {form_data.get('doctor_name', '')}  ხელმოწერა: _________"
 
-        p2 = ""
-        v2 = ""
-        if i + 1 < len(others):
-            p2 = others[i + 1]['parameter']
-            v2 = fd.get(f"other_{others[i + 1]['key']}", '')
 
-        html += f"<tr><td>{p1}</td><td><b>{v1}</b></td><td>{p2}</td><td><b>{v2}</b></td></tr>"
-    html += '</table>'
+def create_urine_document(form_data):
+    doc = load_docx_skeleton('Urine')
+    fill_urine_document(doc, form_data)
+    return doc
 
-    # ფუტერი
-    html += f'''<br><p><b>აპარატურა:</b> {URINE_TEMPLATE["footer"]["equipment"]} &nbsp;&nbsp; 
-    <b>შეასრულა:</b> {fd.get("doctor_name", "")} &nbsp;&nbsp; 
-    <b>ხელმოწერა:</b> _____________</p>
-    <script>window.onload=function(){{setTimeout(function(){{window.print()}},500)}}</script></body></html>'''
 
-    return Response(html, mimetype='text/html')
+@urine_bp.route('/urine/print', methods=['POST'])
+def urine_print_route():
+    fd = request.form.to_dict()
+    return print_response([('Urine', fd)])
 
 
 # ========== CRP FUNCTIONS ==========
-@app.route('/crp')
+@crp_bp.route('/crp')
 def crp_form(): return render_template('form_crp.html', template=CRP_TEMPLATE)
 
 
-def create_crp_document(form_data):
+def build_crp_document(form_data):
+    from docx import Document
+    from docx.shared import Pt, Cm, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
     for s in doc.sections: s.top_margin = Cm(1.5); s.bottom_margin = Cm(1.5); s.left_margin = Cm(
         2.0); s.right_margin = Cm(2.0)
@@ -607,41 +768,39 @@ def create_crp_document(form_data):
     return doc
 
 
-@app.route('/crp/print', methods=['POST'])
+def fill_crp_document(doc, form_data):
+    fill_patient_info(doc, form_data, padding="          ")
+    fill_column(doc.tables[0], 2, [form_data.get(f"res_{item['code']}", '') for item in CRP_TEMPLATE["test_results"]])
+    doc.paragraphs[4].runs[0].text = \
+        f"გამოკვლევა შეასრულა: {form_data.get('doctor_name', '')}          ხელმოწერა: _______________"
+
+
+def create_crp_document(form_data):
+    doc = load_docx_skeleton('CRP')
+    fill_crp_document(doc, form_data)
+    return doc
+
+
+@crp_bp.route('/crp/print', methods=['POST'])
 def crp_print_route():
     fd = request.form.to_dict()
     # 1. შენახვა
-    doc = create_crp_document(fd)
-    fname = f"CRP_{fd.get('last_name')}_{datetime.now().strftime('%H%M%S')}.docx"
-    fpath = os.path.join(get_saved_docs_folder(), fname)
-    doc.save(fpath)
-    add_patient_record(fd.get('first_name'), fd.get('last_name'), fd.get('age'), 'CRP', fname, fd.get('test_date'))
+    fname = report_filename('CRP', fd)
+    job_id = queue_report('CRP', fd, fname)
 
     # 2. ბეჭდვა
-    ph = ', '.join(CRP_TEMPLATE['clinic_info']['phones'])
-    html = f'''<!DOCTYPE html><html><head><meta charset="UTF-8"><title>CRP</title>
-<style>@page{{size:A4;margin:20mm}}body{{font-family:Arial,sans-serif;padding:20px}}
-h1{{color:green;text-align:center;font-size:22px}}h2{{text-align:center;font-size:20px;color:#8e44ad}}
-p{{margin:10px 0;font-size:16px}}table{{width:100%;border-collapse:collapse;margin:20px 0}}
-th,td{{border:1px solid #ddd;padding:12px;text-align:left;font-size:16px}}th{{background:#E8DAEF}}</style></head><body>
-<h1>PREMIUM MEDI / პრემიუმ მედი</h1><p style="text-align:center">{CRP_TEMPLATE['clinic_info']['description']} | ტელ: {ph}</p>
-<h2>{CRP_TEMPLATE['test_details']['title_ge']}</h2>
-<p><b>პაციენტი:</b> {fd.get('first_name')} {fd.get('last_name')}, {fd.get('age')} წ. &nbsp;&nbsp;&nbsp; <b>თარიღი:</b> {fd.get('test_date')}</p>
-<table><tr><th>კოდი</th><th>პარამეტრი</th><th>შედეგი</th><th>ნორმა</th><th>ერთეული</th></tr>'''
-    for item in CRP_TEMPLATE["test_results"]:
-        code = item['code']
-        html += f"<tr><td><b>{code}</b></td><td>{item['parameter']}</td><td><b>{fd.get(f'res_{code}', '')}</b></td><td>{item['reference_range']}</td><td>{item['unit']}</td></tr>"
-    html += f'''</table><p><b>შეასრულა:</b> {fd.get('doctor_name', '')} &nbsp;&nbsp;&nbsp; ხელმოწერა: _______________</p>
-<script>window.onload=function(){{setTimeout(function(){{window.print()}},500)}}</script></body></html>'''
-    return Response(html, mimetype='text/html')
+    return print_response([('CRP', fd)], {'X-Persist-Job': job_id})
 
 
 # ========== TROPONIN FUNCTIONS ==========
-@app.route('/trop')
+@trop_bp.route('/trop')
 def trop_form(): return render_template('form_troponin.html', template=TROPONIN_TEMPLATE)
 
 
-def create_troponin_document(form_data):
+def build_troponin_document(form_data):
+    from docx import Document
+    from docx.shared import Pt, Cm, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
     for s in doc.sections: s.top_margin = Cm(1.5); s.bottom_margin = Cm(1.5); s.left_margin = Cm(
         2.0); s.right_margin = Cm(2.0)
@@ -709,36 +868,591 @@ def create_troponin_document(form_data):
     return doc
 
 
-@app.route('/trop/print', methods=['POST'])
+def fill_troponin_document(doc, form_data):
+    fill_patient_info(doc, form_data, padding="          ")
+    fill_column(doc.tables[0], 2, [form_data.get("result_value", '') for _ in TROPONIN_TEMPLATE["test_info"]["results_table"]])
+    doc.paragraphs[6].runs[1].text = form_data.get('doctor_name', '') + "          "
+
+
+def create_troponin_document(form_data):
+    doc = load_docx_skeleton('Troponin')
+    fill_troponin_document(doc, form_data)
+    return doc
+
+
+DOCX_BUILDERS = {
+    'CBC': build_cbc_document,
+    'Urine': build_urine_document,
+    'CRP': build_crp_document,
+    'Troponin': build_troponin_document,
+}
+
+DOCX_CREATORS = {
+    'CBC': create_cbc_document,
+    'Urine': create_urine_document,
+    'CRP': create_crp_document,
+    'Troponin': create_troponin_document,
+}
+
+
+# ========== DOCX რენდერერის არჩევა ==========
+# 'ooxml' - მზა document.xml შაბლონის შევსება (python-docx ობიექტების გარეშე), 'docx' - python-docx ჩონჩხი
+# მაგ. PREMIUMMEDI_DOCX_RENDERER="CRP:docx,Troponin:docx"
+def parse_docx_renderer(value):
+    renderers = {test_type: 'ooxml' for test_type in DOCX_BUILDERS}
+    for item in filter(None, value.split(',')):
+        test_type, _, renderer = item.partition(':')
+        renderers[test_type.strip()] = renderer.strip()
+    return renderers
+
+
+DOCX_RENDERER = parse_docx_renderer(os.environ.get('PREMIUMMEDI_DOCX_RENDERER', ''))
+
+OOXML_TEMPLATES = {}
+
+
+def get_ooxml_template(test_type):
+    template = OOXML_TEMPLATES.get(test_type)
+    if template is None:
+        template = OOXML_TEMPLATES[test_type] = ooxml_render.OoxmlTemplate.from_builder(DOCX_BUILDERS[test_type])
+    return template
+
+
+def render_docx(test_type, form_data):
+    if DOCX_RENDERER.get(test_type) == 'ooxml':
+        return get_ooxml_template(test_type).render(form_data)
+    buffer = io.BytesIO()
+    DOCX_CREATORS[test_type](form_data).save(buffer)
+    return buffer.getvalue()
+
+
+# ========== სტრუქტურირებული შედეგები ==========
+# ფორმის ყოველი შევსებული ველი ჩანაწერთან ერთად ცალკე სტრიქონად ინახება; შაბლონის პარამეტრებს
+# (WBC, HGB, PRO, CRP...) აქვს კოდი და რიცხვითი მნიშვნელობა, ამიტომ ანალიტიკა DOCX-ს აღარ ხსნის
+def build_result_codes():
+    # ფორმის ველი -> (ტესტის ტიპი, პარამეტრის კოდი)
+    codes = {f"cbc_{item['abbr']}": ('CBC', item['abbr']) for item in CBC_TEMPLATE['cbc_analysis']}
+    for idx, item in enumerate(CBC_TEMPLATE['leukocyte_formula']):
+        match = analyzer_import.LEUKO_CODE_RE.search(item['parameter'])
+        codes[f'leuko_{idx}'] = ('CBC', match.group(1) if match else f'leuko_{idx}')
+    for idx, item in enumerate(URINE_TEMPLATE['physico_chemical']):
+        codes[f'phys_{idx}'] = ('Urine', item['abbr'] or analyzer_import.URINE_UNNAMED[item['parameter']])
+    microscopy = URINE_TEMPLATE['microscopy']
+    for prefix, group in (('epi', 'epithelium'), ('cyl', 'cylinders'), ('other', 'others')):
+        for item in microscopy[group]:
+            codes[f"{prefix}_{item['key']}"] = ('Urine', item['key'])
+    for item in CRP_TEMPLATE['test_results']:
+        codes[f"res_{item['code']}"] = ('CRP', item['code'])
+    codes['result_value'] = ('Troponin', TROPONIN_TEMPLATE['test_info']['results_table'][0]['code'])
+    return codes
+
+
+RESULT_CODES = build_result_codes()
+
+
+def result_rows(test_type, form_data):
+    # პარამეტრის გარდა სხვა ველებიც (მორფოლოგია, ექიმი...) ინახება, კოდის გარეშე. კოდი მხოლოდ ჩანაწერის
+    # ტესტების (ვიზიტში - არჩეულის) ველებს ენიჭება - სხვა ტესტის ველი დინამიკაში არ უნდა მოხვდეს.
+    # მნიშვნელობა ინახება ზუსტად ისე, როგორც დაიბეჭდა - აღდგენილი DOCX ორიგინალს უნდა დაემთხვეს
+    test_types = set(test_type.split('+'))
+    rows = []
+    for field, value in form_data.items():
+        value = '' if value is None else str(value)
+        if not value.strip():
+            continue
+        row_type, code = RESULT_CODES.get(field, (test_type, None))
+        if row_type not in test_types:
+            row_type, code = test_type, None
+        rows.append({"test_type": row_type, "field": field, "code": code, "value": value,
+                     "value_num": patient_store.parse_number(value) if code else None})
+    return rows
+
+
+@main_bp.route('/results/<int:record_id>')
+def record_results(record_id):
+    record = get_registry().get(record_id)
+    if record is None:
+        return jsonify({"success": False, "error": "ჩანაწერი ვერ მოიძებნა"}), 404
+    return jsonify({"success": True, "record": record, "results": get_registry().results([record_id])[record_id]})
+
+
+# ========== შედეგების დინამიკა ==========
+# პაციენტი = იგივე სახელი და გვარი (name_key); დინამიკა CBC_TEMPLATE და CRP_TEMPLATE პარამეტრებზე
+def build_trend_parameters():
+    parameters = [trends.parameter('CBC', item['abbr'], item['parameter'], item['unit'], item['reference_range'])
+                  for item in CBC_TEMPLATE['cbc_analysis']]
+    for idx, item in enumerate(CBC_TEMPLATE['leukocyte_formula']):
+        parameters.append(trends.parameter('CBC', RESULT_CODES[f'leuko_{idx}'][1], item['parameter'], '%', item['norm']))
+    parameters += [trends.parameter('CRP', item['code'], item['parameter'], item['unit'], item['reference_range'])
+                   for item in CRP_TEMPLATE['test_results']]
+    return parameters
+
+
+TREND_PARAMETERS = build_trend_parameters()
+
+
+def patient_visits(record):
+    first, last = patient_store.name_key(record['first_name']), patient_store.name_key(record['last_name'])
+    if not first or not last:
+        # სახელის ან გვარის გარეშე პაციენტი ვერ იდენტიფიცირდება - მხოლოდ ეს ვიზიტი
+        return [record]
+    visits = [r for r in get_registry().search(last)
+              if patient_store.name_key(r['first_name']) == first and patient_store.name_key(r['last_name']) == last]
+    return sorted(visits, key=lambda r: (r['test_date'] or (r['created_at'] or '')[:10], r['created_at'] or '', r['id']))
+
+
+@main_bp.route('/trend/<int:record_id>')
+def trend_route(record_id):
+    record = get_registry().get(record_id)
+    if record is None:
+        return ("Not Found", 404)
+    visits = patient_visits(record)
+    try:
+        visits, series = trends.compute_trends(visits, get_registry().results([v['id'] for v in visits]),
+                                               TREND_PARAMETERS)
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    data = {
+        "patient": {"first_name": record['first_name'], "last_name": record['last_name'], "age": record['age']},
+        "visits": [{"id": v['id'], "test_date": v['test_date'] or (v['created_at'] or '')[:10],
+                    "test_type": v['test_type'], "filename": v['filename']} for v in visits],
+        "parameters": series,
+    }
+    if request.args.get('format') == 'json':
+        return jsonify(data)
+    return render_template('trend.html', **data)
+
+
+# ========== saved_docs ქეში ==========
+SAVED_DOCS_MAX_BYTES = int(os.environ.get('PREMIUMMEDI_SAVED_DOCS_MAX_MB', '256')) * 1024 * 1024
+DOC_CACHE = None
+doc_cache_lock = threading.Lock()
+
+
+def get_doc_cache():
+    global DOC_CACHE
+    with doc_cache_lock:
+        if DOC_CACHE is None:
+            DOC_CACHE = doc_cache.DocCache(get_saved_docs_folder(), SAVED_DOCS_MAX_BYTES, regenerable_files)
+        return DOC_CACHE
+
+
+def regenerable_files(filenames):
+    # გამოძევება მხოლოდ იმ ფაილებისთვის, რომელთა ჩანაწერს შედეგები აქვს
+    registry = get_registry()
+    records = {name: registry.by_filename(name) for name in filenames}
+    results = registry.results([r['id'] for r in records.values() if r is not None])
+    return {name for name, r in records.items() if r is not None and results[r['id']]}
+
+
+def regenerate_document(record):
+    form_data = {row['field']: row['value'] for row in get_registry().results([record['id']])[record['id']]}
+    if not form_data:
+        return None
+    test_types = record['test_type'].split('+')
+    if len(test_types) > 1:
+        return render_visit_docx(test_types, form_data)
+    return render_docx(record['test_type'], form_data)
+
+
+# ========== ფონური შენახვა ==========
+PERSIST_QUEUE = persist_queue.PersistQueue(status_folder=get_persist_jobs_folder)
+atexit.register(PERSIST_QUEUE.shutdown)
+
+
+def shutdown():
+    # wsgi_server აქ იძახებს სერვერის გაჩერებისას: worker პროცესში atexit არ სრულდება
+    PERSIST_QUEUE.shutdown()
+
+
+def open_unique_file(folder, fname):
+    # ერთსა და იმავე წამში ერთი გვარის რამდენიმე ბეჭდვა (სხვადასხვა worker-იდანაც) ფაილს არ გადააწერს
+    stem, ext = os.path.splitext(fname)
+    for n in range(1000):
+        candidate = fname if n == 0 else f"{stem}_{n}{ext}"
+        try:
+            return candidate, open(os.path.join(folder, candidate), 'xb')
+        except FileExistsError:
+            continue
+    raise FileExistsError(fname)
+
+
+# ფაილის სახელის პრეფიქსი saved_docs-ში
+REPORT_FILE_PREFIXES = {'CBC': 'CBC', 'Urine': 'Urine', 'CRP': 'CRP', 'Troponin': 'Trop', 'Visit': 'Visit'}
+
+
+def report_filename(test_type, form_data):
+    return f"{REPORT_FILE_PREFIXES[test_type]}_{form_data.get('last_name')}_{datetime.now().strftime('%H%M%S')}.docx"
+
+
+def persist_report(test_type, form_data, fname, docx_bytes):
+    folder = get_saved_docs_folder()
+    fname, f = open_unique_file(folder, fname)
+    try:
+        with f:
+            f.write(docx_bytes)
+        record = add_patient_record(form_data.get('first_name'), form_data.get('last_name'), form_data.get('age'),
+                                    test_type, fname, form_data.get('test_date'), result_rows(test_type, form_data))
+    except Exception:
+        # რეგისტრაცია ვერ მოხერხდა - ფაილი რეესტრის გარეშე არ უნდა დარჩეს (როგორც save_batch-ში)
+        try:
+            os.remove(os.path.join(folder, fname))
+        except OSError:
+            pass
+        raise
+    get_doc_cache().added(len(docx_bytes))
+    return {"record_id": record["id"], "filename": fname}
+
+
+def queue_report(test_type, form_data, fname):
+    # დოკუმენტი აქვე იგება (OOXML-ით წამის მეასედებია), დისკზე ჩაწერა და რეგისტრაცია - ფონურად
+    return PERSIST_QUEUE.submit(persist_report, test_type, form_data, fname, render_docx(test_type, form_data),
+                                test_type=test_type, filename=fname)
+
+
+# ========== პაკეტური გენერაცია ==========
+# დღის შედეგები ერთი მოთხოვნით: DOCX-ები პროცესების პულში იგება, ფაილები saved_docs-ში იწერება,
+# რეესტრში კი ყველა ერთი ტრანზაქციით რეგისტრირდება
+BATCH_MAX_REPORTS = 500
+BATCH_PARALLEL_MIN = 8  # ამაზე ნაკლები ანგარიში აქვე იგება - პულის ზედნადები არ ღირს
+BATCH_FORMATS = ('zip', 'merged')
+BATCH_WORKERS = min(4, os.cpu_count() or 1)
+BATCH_POOL = None
+batch_pool_lock = threading.Lock()
+
+
+def get_batch_pool():
+    # spawn: worker-ები სუფთა პროცესებია (ნაკადიანი სერვერის fork-ი საშიშია) და ერთხელ იქმნება
+    global BATCH_POOL
+    with batch_pool_lock:
+        if BATCH_POOL is None:
+            BATCH_POOL = ProcessPoolExecutor(max_workers=BATCH_WORKERS,
+                                             mp_context=multiprocessing.get_context('spawn'))
+            atexit.register(BATCH_POOL.shutdown)
+        return BATCH_POOL
+
+
+def render_batch_item(report):
+    test_type, form_data = report
+    return render_docx(test_type, form_data)
+
+
+def parse_batch(payload):
+    reports = payload.get('reports') if isinstance(payload, dict) else payload
+    if not isinstance(reports, list) or not reports:
+        raise ValueError("მოსალოდნელია ანგარიშების არაცარიელი სია")
+    if len(reports) > BATCH_MAX_REPORTS:
+        raise ValueError(f"ერთ პაკეტში მაქსიმუმ {BATCH_MAX_REPORTS} ანგარიშია")
+    test_types = {name.lower(): name for name in DOCX_CREATORS}
+    parsed = []
+    for i, report in enumerate(reports):
+        if not isinstance(report, dict) or not isinstance(report.get('form', {}), dict):
+            raise ValueError(f"ანგარიში #{i}: მოსალოდნელია {{'test_type': ..., 'form': {{...}}}}")
+        test_type = test_types.get(str(report.get('test_type', '')).lower())
+        if test_type is None:
+            raise ValueError(f"ანგარიში #{i}: უცნობი ტესტი '{report.get('test_type')}'")
+        form_data = {str(k): '' if v is None else str(v) for k, v in report.get('form', {}).items()}
+        parsed.append((test_type, form_data))
+    return parsed
+
+
+def render_batch(reports):
+    # --workers რეჟიმის worker-ები daemon პროცესებია და შვილ პროცესებს ვერ ქმნიან - იქ ყველაფერი აქვე იგება
+    # (პარალელიზმს worker-ები თავად იძლევიან)
+    if len(reports) < BATCH_PARALLEL_MIN or wsgi_server.is_worker_process():
+        return [render_batch_item(report) for report in reports]
+    chunksize = max(1, len(reports) // (BATCH_WORKERS * 4))
+    return list(get_batch_pool().map(render_batch_item, reports, chunksize=chunksize))
+
+
+def write_batch(reports, documents, written):
+    # DOCX-ები saved_docs-ში; ჩაწერილი სახელები written-ს ემატება, რომ შეცდომისას წაიშალოს
+    folder = get_saved_docs_folder()
+    records = []
+    for (test_type, form_data), docx_bytes in zip(reports, documents):
+        fname, f = open_unique_file(folder, report_filename(test_type, form_data))
+        written.append(fname)
+        with f:
+            f.write(docx_bytes)
+        records.append(patient_store.new_record(form_data.get('first_name'), form_data.get('last_name'),
+                                                form_data.get('age'), test_type, fname,
+                                                form_data.get('test_date'),
+                                                result_rows(test_type, form_data)))
+    return records
+
+
+def remove_written(written):
+    # რეესტრში რომ არ მოხვდა, ის ფაილებიც არ უნდა დარჩეს
+    folder = get_saved_docs_folder()
+    for fname in written:
+        try:
+            os.remove(os.path.join(folder, fname))
+        except OSError:
+            pass
+
+
+def save_batch(reports, documents):
+    written = []
+    try:
+        records = get_registry().add_many(write_batch(reports, documents, written))
+    except Exception:
+        remove_written(written)
+        raise
+    get_doc_cache().added(sum(len(docx_bytes) for docx_bytes in documents))
+    return records
+
+
+def batch_zip(records, documents):
+    buffer = io.BytesIO()
+    # DOCX უკვე შეკუმშულია - ZIP_STORED
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as z:
+        for record, docx_bytes in zip(records, documents):
+            z.writestr(record['filename'], docx_bytes)
+    buffer.seek(0)
+    return buffer
+
+
+@main_bp.route('/batch', methods=['POST'])
+def batch_route():
+    payload = request.get_json(silent=True)
+    output = request.args.get('format') or (payload.get('format') if isinstance(payload, dict) else None) or 'zip'
+    try:
+        if output not in BATCH_FORMATS:
+            raise ValueError(f"format: {' | '.join(BATCH_FORMATS)}")
+        reports = parse_batch(payload)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    documents = render_batch(reports)
+    records = save_batch(reports, documents)
+    headers = {'X-Batch-Records': ','.join(str(r['id']) for r in records)}
+    if output == 'merged':
+        return print_response(reports, headers)
+    response = send_file(batch_zip(records, documents), mimetype='application/zip', as_attachment=True,
+                         download_name=f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+    response.headers.update(headers)
+    return no_store(response)
+
+
+# ========== ანალიზატორის იმპორტი ==========
+# SIEMENS CLINITEK Status+ და Firance FS-113 ექსპორტი (CSV ან HL7) ნაკადურად იკითხება; ყოველი IMPORT_CHUNK
+# ანგარიში batch-ის გზით იგება (პროცესების პული) და რეესტრში ერთი ტრანზაქციით რეგისტრირდება
+ANALYZER_CODES = analyzer_import.build_code_maps(CBC_TEMPLATE, URINE_TEMPLATE, CRP_TEMPLATE)
+IMPORT_CHUNK = 50
+
+
+def import_results(lines, fmt=None, defaults=None, atomic=False, checkpoint=None):
+    # atomic: DOCX-ები ნაწილ-ნაწილ იგება და იწერება, რეესტრში კი მთელი ფაილი ერთი ტრანზაქციით ხვდება -
+    # შეწყვეტისას ნაწილობრივ იმპორტირებული ფაილი არ რჩება. checkpoint(filenames=...) რეგისტრაციამდე
+    # იძახება, რომ ავარიის შემდეგ შემოწმდეს, შესრულდა თუ არა ტრანზაქცია
+    summary = {"imported": 0, "records": [], "skipped": [], "unmapped": set()}
+    pending, written, size = [], [], 0
+    try:
+        for chunk in analyzer_import.chunked(analyzer_import.parse(lines, ANALYZER_CODES, fmt), IMPORT_CHUNK):
+            reports = []
+            for result in chunk:
+                summary["unmapped"].update(result.unmapped)
+                if result.error:
+                    summary["skipped"].append({"source": result.source, "error": result.error})
+                else:
+                    reports.append((result.test_type, {**(defaults or {}), **result.form}))
+            if not reports:
+                continue
+            documents = render_batch(reports)
+            if atomic:
+                pending += write_batch(reports, documents, written)
+                size += sum(len(docx_bytes) for docx_bytes in documents)
+                continue
+            records = save_batch(reports, documents)
+            summary["imported"] += len(records)
+            summary["records"] += [r['id'] for r in records]
+        if pending:
+            if checkpoint is not None:
+                checkpoint(filenames=written)
+            records = get_registry().add_many(pending)
+            summary["imported"] += len(records)
+            summary["records"] += [r['id'] for r in records]
+    except Exception:
+        remove_written(written)
+        raise
+    if size:
+        get_doc_cache().added(size)
+    summary["unmapped"] = sorted(summary["unmapped"])
+    return summary
+
+
+@main_bp.route('/import', methods=['POST'])
+def import_route():
+    # ფაილი multipart-ით (file) ან პირდაპირ მოთხოვნის სხეულად; ?format=csv|hl7, ნაგულისხმევად თავად ცნობს
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    fmt = request.args.get('format')
+    if fmt not in (None, 'csv', 'hl7'):
+        return jsonify({"success": False, "error": "format: csv | hl7"}), 400
+    defaults = {k: request.values[k] for k in ('doctor_name',) if request.values.get(k)}
+    summary = import_results(analyzer_import.iter_lines(stream), fmt, defaults)
+    return jsonify({"success": True, **summary})
+
+
+# ========== შემოსული ფაილების დამუშავება ==========
+# --watch: საქაღალდეში ჩაგდებული ექსპორტი import_results-ით მუშავდება, ხელით გადატანის გარეშე
+INBOX_WATCHER = None
+
+
+def import_inbox_file(path, checkpoint=None):
+    with open(path, 'rb') as f:
+        summary = import_results(analyzer_import.iter_lines(f), atomic=True, checkpoint=checkpoint)
+    name = os.path.basename(path)
+    if not summary["imported"]:
+        raise ValueError(f"{name}: ანგარიში ვერ წაიკითხა (გამოტოვებული: {len(summary['skipped'])})")
+    print(f"📥 {name}: {summary['imported']} ანგარიში")
+    return {"records": summary["records"], "skipped": summary["skipped"], "unmapped": summary["unmapped"]}
+
+
+def recover_inbox_file(entry):
+    # წინა გაშვება რეგისტრაციისას შეწყდა. add_many ერთი ტრანზაქციაა: ან ყველა ჩანაწერი არის რეესტრში
+    # (ფაილი უკვე იმპორტირებულია), ან არცერთი - მაშინ დარჩენილი DOCX-ები იშლება და ფაილი თავიდან მუშავდება
+    registry = get_registry()
+    records = [registry.by_filename(name) for name in entry.get("filenames", [])]
+    if records and None not in records:
+        return {"records": [r["id"] for r in records]}
+    remove_written(name for name, record in zip(entry.get("filenames", []), records) if record is None)
+    return None
+
+
+def start_inbox_watcher(folder):
+    global INBOX_WATCHER
+    INBOX_WATCHER = inbox_watcher.InboxWatcher(folder, import_inbox_file, recover=recover_inbox_file).start()
+    atexit.register(INBOX_WATCHER.stop)
+    return INBOX_WATCHER
+
+
+# ========== მზადყოფნა ==========
+APP_READY = threading.Event()
+WARM_UP_SECONDS = 0.0
+
+
+def warm_up():
+    # ბაზის გახსნა და DOCX შაბლონების აგება, სანამ პირველი მოთხოვნა მოვა
+    global WARM_UP_SECONDS
+    start = time.perf_counter()
+    get_registry()
+    build_docx_skeletons()
+    for name in PRINT_TEMPLATES:
+        app.jinja_env.get_template(name)
+    WARM_UP_SECONDS = time.perf_counter() - start
+    APP_READY.set()
+
+
+@main_bp.route('/health')
+def health():
+    status = 200 if APP_READY.is_set() else 503
+    return jsonify({"status": "ready" if status == 200 else "starting", "pid": os.getpid(),
+                    "warm_up_seconds": WARM_UP_SECONDS}), status
+
+
+@main_bp.route('/persist/<job_id>')
+def persist_status(job_id):
+    job = PERSIST_QUEUE.status(job_id)
+    if job is None:
+        return jsonify({"status": "unknown"}), 404
+    return jsonify(job)
+
+
+@trop_bp.route('/trop/print', methods=['POST'])
 def trop_print_route():
     fd = request.form.to_dict()
     # 1. შენახვა
-    doc = create_troponin_document(fd)
-    fname = f"Trop_{fd.get('last_name')}_{datetime.now().strftime('%H%M%S')}.docx"
-    fpath = os.path.join(get_saved_docs_folder(), fname)
-    doc.save(fpath)
-    add_patient_record(fd.get('first_name'), fd.get('last_name'), fd.get('age'), 'Troponin', fname, fd.get('test_date'))
+    fname = report_filename('Troponin', fd)
+    job_id = queue_report('Troponin', fd, fname)
 
     # 2. ბეჭდვა
-    html = f'''<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Troponin</title>
-<style>@page{{size:A4;margin:20mm}}body{{font-family:Arial,sans-serif;padding:20px}}
-h1{{color:green;text-align:center;font-size:22px}}h2{{text-align:center;font-size:20px;color:#8e44ad}}
-p{{margin:10px 0;font-size:16px}}table{{width:100%;border-collapse:collapse;margin:20px 0}}
-th,td{{border:1px solid #ddd;padding:12px;text-align:left;font-size:16px}}th{{background:#FDEBD0}}</style></head><body>
-<h1>PREMIUM MEDI / პრემიუმ მედი</h1>
-<p style="text-align:center">{TROPONIN_TEMPLATE['document_info']['clinic_description']} | {TROPONIN_TEMPLATE['document_info']['contact']}</p>
-<h2>{TROPONIN_TEMPLATE['test_info']['title']}</h2>
-<p><b>პაციენტი:</b> {fd.get('first_name', '')} {fd.get('last_name', '')}, {fd.get('age', '')} წ. &nbsp;&nbsp;&nbsp; <b>თარიღი:</b> {fd.get('test_date', '')}</p>
-<table><tr><th>კოდი</th><th>პარამეტრი</th><th>შედეგი</th><th>ნორმა</th></tr>'''
-    for item in TROPONIN_TEMPLATE["test_info"]["results_table"]:
-        html += f"<tr><td>{item['code']}</td><td>{item['parameter']}</td><td><b>{fd.get('result_value', '')}</b></td><td>{item['reference_range']}</td></tr>"
-    html += f'''</table><p><b>აპარატურა:</b> {TROPONIN_TEMPLATE["footer_note"]["equipment"]}</p>
-<p><b>შეასრულა:</b> {fd.get('doctor_name', '')} &nbsp;&nbsp;&nbsp; <b>ხელმოწერა:</b> _________________________</p>
-<script>window.onload=function(){{setTimeout(function(){{window.print()}},500)}}</script></body></html>'''
-    return Response(html, mimetype='text/html')
+    return print_response([('Troponin', fd)], {'X-Persist-Job': job_id})
+
+
+# ========== VISIT FUNCTIONS ==========
+# ერთი ვიზიტის რამდენიმე ანალიზი: ერთი DOCX (თითო ანალიზი ცალკე სექციაში), ერთი ბეჭდვის გვერდი,
+# ერთი ფაილი და ერთი ჩანაწერი რეესტრში
+VISIT_TESTS = [('CBC', 'სისხლის საერთო ანალიზი (CBC)'), ('Urine', 'შარდის საერთო ანალიზი'),
+               ('CRP', 'C-რეაქტიული ცილა (CRP)'), ('Troponin', 'ტროპონინის ტესტი')]
+
+
+@visit_bp.route('/visit')
+def visit_form():
+    return render_template('form_visit.html', tests=VISIT_TESTS, cbc=CBC_TEMPLATE, urine=URINE_TEMPLATE,
+                           crp=CRP_TEMPLATE, trop=TROPONIN_TEMPLATE)
+
+
+def render_visit_docx(test_types, form_data):
+    return ooxml_render.merge_docx([render_docx(test_type, form_data) for test_type in test_types])
+
+
+@visit_bp.route('/visit/print', methods=['POST'])
+def visit_print_route():
+    fd = request.form.to_dict()
+    selected = set(request.form.getlist('tests'))
+    test_types = [test_type for test_type, _ in VISIT_TESTS if test_type in selected]
+    if not test_types:
+        return jsonify({"success": False, "error": "აირჩიეთ მინიმუმ ერთი ანალიზი"}), 400
+    # 1. შენახვა - ერთი ფაილი და ერთი ჩანაწერი, ტესტის ტიპი: "CBC+Urine+CRP"
+    test_type = '+'.join(test_types)
+    fname = report_filename('Visit', fd)
+    job_id = PERSIST_QUEUE.submit(persist_report, test_type, fd, fname, render_visit_docx(test_types, fd),
+                                  test_type=test_type, filename=fname)
+
+    # 2. ბეჭდვა
+    return print_response([(t, fd) for t in test_types], {'X-Persist-Job': job_id})
+
+for _bp in BLUEPRINTS:
+    app.register_blueprint(_bp)
 
 
 # ========== STARTUP ==========
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Premium Medi')
+    parser.add_argument('--serve', action='store_true', help='საწარმოო WSGI სერვერი (waitress) dev სერვერის ნაცვლად')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=1, help='worker პროცესების რაოდენობა (--serve)')
+    parser.add_argument('--threads', type=int, default=8, help='ნაკადები თითო worker-ში (--serve)')
+    parser.add_argument('--no-browser', action='store_true', help='ბრაუზერი ავტომატურად არ გაიხსნას')
+    parser.add_argument('--import', dest='import_files', nargs='+', metavar='FILE',
+                        help='ანალიზატორის ექსპორტის (CSV/HL7) იმპორტი სერვერის გაშვების გარეშე')
+    parser.add_argument('--watch', nargs='?', const=get_inbox_folder(), metavar='DIR',
+                        help='შემოსული ფაილების საქაღალდის ფონური დამუშავება (ნაგულისხმევად: inbox)')
+    parser.add_argument('--doctor', help='გამოკვლევის შემსრულებელი იმპორტირებულ ანგარიშებში (--import)')
+    return parser.parse_args(argv)
+
+
 if __name__ == '__main__':
-    threading.Timer(1.5, lambda: webbrowser.open('http://127.0.0.1:5000')).start()
-    app.run(host='127.0.0.1', port=5000, debug=False, use_reloader=False)
\ No newline at end of file
+    multiprocessing.freeze_support()
+    # worker-ები და wsgi_server ამ მოდულს 'app' სახელით იმპორტირებენ - იგივე ობიექტი იყოს
+    sys.modules.setdefault('app', sys.modules['__main__'])
+    args = parse_args()
+    if args.import_files:
+        defaults = {'doctor_name': args.doctor} if args.doctor else None
+        for path in args.import_files:
+            started = time.perf_counter()
+            with open(path, 'rb') as f:
+                summary = import_results(analyzer_import.iter_lines(f), defaults=defaults)
+            elapsed = time.perf_counter() - started
+            print(f"{path}: {summary['imported']} ანგარიში {elapsed:.1f} წამში "
+                  f"({summary['imported'] / elapsed * 60:.0f}/წთ), გამოტოვებული: {len(summary['skipped'])}")
+            for skipped in summary['skipped']:
+                print(f"  {skipped['source']}: {skipped['error']}")
+            if summary['unmapped']:
+                print(f"  უცნობი კოდები: {', '.join(summary['unmapped'])}")
+        sys.exit(0)
+    # --watch მშობელ პროცესში ერთხელ იწყება; --workers რეჟიმში - მხოლოდ worker-ების გაშვების შემდეგ
+    start_watcher = (lambda: start_inbox_watcher(args.watch)) if args.watch else None
+    url = f'http://{args.host}:{args.port}'
+    if args.serve:
+        wsgi_server.serve('app', host=args.host, port=args.port, workers=args.workers, threads=args.threads,
+                          on_ready=lambda: launcher.open_when_ready(url, STARTED_AT, open_browser=False),
+                          on_started=start_watcher)
+    else:
+        if start_watcher is not None:
+            start_watcher()
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+        launcher.open_when_ready(url, STARTED_AT, open_browser=not args.no_browser)
+        app.run(host=args.host, port=args.port, debug=False, use_reloader=False)
@@ -1,22 +1,12 @@
 from flask import Flask, render_template, request, send_file, Response
-from docx import Document
-from docx.shared import Pt, Cm, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import io
 import os
 import sys
-import base64
+import threading
 from datetime import datetime
 
+import pdf_common
+
 
 def get_base_path():
     if getattr(sys, 'frozen', False):
@@ -29,13 +19,10 @@ template_folder = os.path.join(base_path, 'templates')
 static_folder = os.path.join(base_path, 'static')
 app = Flask(__name__, template_folder=template_folder, static_folder=static_folder)
 
-# ქართული ფონტის რეგისტრაცია
-font_path = os.path.join(static_folder, 'fonts', 'DejaVuSans.ttf')
-if os.path.exists(font_path):
-    pdfmetrics.registerFont(TTFont('Georgian', font_path))
-    FONT_NAME = 'Georgian'
-else:
-    FONT_NAME = 'Helvetica'
+# ფონტი, სტილები და PDF ქეში საერთოა (pdf_common); PDF-ები ქეშიდან ბრუნდება, თუ ფორმა არ შეცვლილა
+PDF_CACHE = pdf_common.PdfCache()
+PDF_BLOBS = pdf_common.BlobStore()
+
 
 # შარდის შაბლონი
 urinalysis_template = {
@@ -90,12 +77,17 @@ urinalysis_template = {
 
 
 def set_cell_shading(cell, color):
+    from docx.oxml.ns import qn
+    from docx.oxml import OxmlElement
     shading_elm = OxmlElement('w:shd')
     shading_elm.set(qn('w:fill'), color)
     cell._tc.get_or_add_tcPr().append(shading_elm)
 
 
 def create_urinalysis_document(form_data):
+    from docx import Document
+    from docx.shared import Pt, Cm, RGBColor
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
     doc = Document()
 
     for s in doc.sections:
@@ -216,6 +208,14 @@ def create_urinalysis_document(form_data):
 
 
 def create_pdf_document(form_data):
+    return io.BytesIO(PDF_CACHE.get_or_build('Urinalysis', form_data, build_pdf_document))
+
+
+def build_pdf_document(form_data):
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import cm
+
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -226,30 +226,10 @@ def create_pdf_document(form_data):
         bottomMargin=1 * cm
     )
 
-    # სტილები
-    georgian_style = ParagraphStyle(
-        'Georgian',
-        fontName=FONT_NAME,
-        fontSize=10,
-        leading=14
-    )
-
-    header_style = ParagraphStyle(
-        'GeorgianHeader',
-        fontName=FONT_NAME,
-        fontSize=14,
-        alignment=1,
-        textColor=colors.darkgreen,
-        spaceAfter=6
-    )
-
-    title_style = ParagraphStyle(
-        'GeorgianTitle',
-        fontName=FONT_NAME,
-        fontSize=12,
-        alignment=1,
-        spaceAfter=12
-    )
+    styles = pdf_common.get_styles()
+    georgian_style = styles['georgian']
+    header_style = styles['header']
+    title_style = styles['title']
 
     story = []
 
@@ -257,7 +237,7 @@ def create_pdf_document(form_data):
     story.append(Paragraph("PREMIUM MEDI / პრემიუმ მედი", header_style))
     story.append(Paragraph(
         f"{urinalysis_template['header']['subtitle']} | ტელ: {', '.join(urinalysis_template['header']['phones'])}",
-        ParagraphStyle('Sub', fontName=FONT_NAME, fontSize=9, alignment=1)
+        styles['sub']
     ))
     story.append(Spacer(1, 0.3 * cm))
     story.append(Paragraph(
@@ -287,16 +267,7 @@ def create_pdf_document(form_data):
         ])
 
     phys_table = Table(phys_data, colWidths=[1.5 * cm, 4 * cm, 2.5 * cm, 3 * cm, 2 * cm])
-    phys_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#FFF2CC')),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
-        ('ALIGN', (2, 1), (2, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('TOPPADDING', (0, 0), (-1, -1), 3),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-    ]))
+    phys_table.setStyle(pdf_common.table_style('#FFF2CC', (2,), padding=3))
     story.append(phys_table)
     story.append(Spacer(1, 0.4 * cm))
 
@@ -320,15 +291,7 @@ def create_pdf_document(form_data):
         micro_data.append(row)
 
     micro_table = Table(micro_data, colWidths=[4 * cm, 2.5 * cm, 4 * cm, 2.5 * cm])
-    micro_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#E2EFDA')),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
-        ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-        ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ]))
+    micro_table.setStyle(pdf_common.table_style('#E2EFDA', (1, 3)))
     story.append(micro_table)
     story.append(Spacer(1, 0.3 * cm))
 
@@ -346,14 +309,7 @@ def create_pdf_document(form_data):
         others_data.append(row)
 
     others_table = Table(others_data, colWidths=[4 * cm, 2.5 * cm, 4 * cm, 2.5 * cm])
-    others_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#DDEBF7')),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ('FONTSIZE', (0, 0), (-1, -1), 8),
-        ('FONTNAME', (0, 0), (-1, -1), FONT_NAME),
-        ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-        ('ALIGN', (3, 1), (3, -1), 'CENTER'),
-    ]))
+    others_table.setStyle(pdf_common.table_style('#DDEBF7', (1, 3), valign=False))
     story.append(others_table)
     story.append(Spacer(1, 0.4 * cm))
 
@@ -364,8 +320,7 @@ def create_pdf_document(form_data):
     story.append(Paragraph("ხელმოწერა: _________________________", georgian_style))
 
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
 
 
 @app.route('/')
@@ -394,8 +349,8 @@ def generate_urinalysis_pdf():
     form_data = request.form.to_dict()
     buffer = create_pdf_document(form_data)
 
-    # PDF კონტენტი ავტო-ბეჭდვით
-    pdf_content = buffer.getvalue()
+    # PDF კონტენტი ავტო-ბეჭდვით: გვერდი მხოლოდ /pdf/<token> მისამართს შეიცავს
+    token = PDF_BLOBS.put(buffer.getvalue())
 
     html_wrapper = f'''
     <!DOCTYPE html>
@@ -408,7 +363,7 @@ def generate_urinalysis_pdf():
         </style>
     </head>
     <body>
-        <iframe id="pdfFrame" src="data:application/pdf;base64,{base64.b64encode(pdf_content).decode()}"></iframe>
+        <iframe id="pdfFrame" src="/pdf/{token}"></iframe>
         <script>
             window.onload = function() {{
                 setTimeout(function() {{
@@ -424,10 +379,16 @@ def generate_urinalysis_pdf():
     return Response(html_wrapper, mimetype='text/html')
 
 
+@app.route('/pdf/<token>')
+def pdf_blob(token):
+    return pdf_common.pdf_response(PDF_BLOBS, token)
+
+
 if __name__ == '__main__':
     print("=" * 50)
     print("🧪 Urinalysis აპლიკაცია გაშვებულია")
     print("=" * 50)
     print("🌐 გახსენით: http://127.0.0.1:5001")
     print("=" * 50)
+    threading.Thread(target=pdf_common.warm_up, name='warm-up', daemon=True).start()
     app.run(debug=False, host='127.0.0.1', port=5001)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import sys
+import time
+
+import app
+
+# ბენჩმარკი: python-docx ჩონჩხი vs პირდაპირი OOXML შაბლონი
+# გაშვება: python bench_docx.py [გამეორებები]
+
+SAMPLE_FORM = {
+    'first_name': 'ნინო', 'last_name': 'ბერიძე', 'age': '34', 'test_date': '2026-01-21',
+    'doctor_name': 'ექიმი', 'erythrocyte_morphology': 'ნორმა', 'leukocyte_morphology': 'ნორმა',
+    'result_value': 'უარყოფითი', 'res_CRP': '4.2', 'res_hsCRP': '0.8',
+}
+SAMPLE_FORM.update({f"cbc_{item['abbr']}": '5.1' for item in app.CBC_TEMPLATE['cbc_analysis']})
+SAMPLE_FORM.update({f'leuko_{idx}': '3' for idx in range(len(app.CBC_TEMPLATE['leukocyte_formula']))})
+SAMPLE_FORM.update({f'phys_{idx}': '1' for idx in range(len(app.URINE_TEMPLATE['physico_chemical']))})
+
+
+def bench(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(repeat=50):
+    print(f"{'ტესტი':<10} {'build':>10} {'docx':>10} {'ooxml':>10} {'x':>6}")
+    for test_type, builder in app.DOCX_BUILDERS.items():
+        creator = app.DOCX_CREATORS[test_type]
+        template = app.get_ooxml_template(test_type)
+        build_ms = bench(lambda: builder(SAMPLE_FORM).save(app.io.BytesIO()), repeat)
+        docx_ms = bench(lambda: creator(SAMPLE_FORM).save(app.io.BytesIO()), repeat)
+        ooxml_ms = bench(lambda: template.render(SAMPLE_FORM), repeat)
+        print(f"{test_type:<10} {build_ms:>8.2f}ms {docx_ms:>8.2f}ms {ooxml_ms:>8.2f}ms {docx_ms / ooxml_ms:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,61 @@
+import os
+import shlex
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import launcher
+
+# გაშვების დროის ანგარიში: პროცესის სტარტიდან /health 200-მდე, ყოველი build კონფიგურაციისთვის
+# გაშვება: python bench_launch.py [--runs N] [ბრძანება ...]
+#   python bench_launch.py dist/PremiumMedi/PremiumMedi.exe dist/PremiumMedi.exe "python app.py"
+# პირველი გაშვება "ცივია" (დისკის ქეში ცარიელია), დანარჩენების მედიანა - "თბილი"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_COMMANDS = [f'"{sys.executable}" app.py']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def launch_once(command, timeout=60):
+    port = free_port()
+    args = f'{command} --port {port} --no-browser'
+    # Windows-ზე CreateProcess თავად შლის ბრძანების სტრიქონს; shell-ის გარეშე kill() თავად სერვერს აჩერებს
+    if os.name != 'nt':
+        args = shlex.split(args)
+    start = time.perf_counter()
+    process = subprocess.Popen(args, cwd=BASE_DIR,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        health = launcher.wait_until_ready(f'http://127.0.0.1:{port}', timeout, interval=0.02)
+        ready = time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+    if health is None:
+        raise RuntimeError(f"{command}: სერვერი {timeout} წამში არ გამზადდა")
+    return ready
+
+
+def main(commands, runs=5):
+    print(f"{'კონფიგურაცია':<45} {'ცივი':>8} {'თბილი':>8} {'min':>8} {'max':>8}")
+    for command in commands:
+        times = [launch_once(command) for _ in range(runs)]
+        warm = statistics.median(times[1:]) if runs > 1 else times[0]
+        print(f"{command[-45:]:<45} {times[0]:>7.2f}s {warm:>7.2f}s {min(times):>7.2f}s {max(times):>7.2f}s")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    runs = 5
+    if '--runs' in args:
+        i = args.index('--runs')
+        runs = int(args[i + 1])
+        del args[i:i + 2]
+    main(args or DEFAULT_COMMANDS, runs)
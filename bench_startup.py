@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# ბენჩმარკი: გაშვების დრო და იმპორტის ღირებულება მოდულების მიხედვით (python -X importtime)
+# გაშვება: python bench_startup.py [მოდული ...] [--top N]
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODULES = ['app', 'app_cbc', 'app_urine', 'run_all']
+
+
+def import_profile(module_name):
+    # ცალკე პროცესი - ყოველი გაზომვა იწყება ცარიელი sys.modules-ით
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+                            cwd=BASE_DIR, capture_output=True, text=True, encoding='utf-8')
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise RuntimeError(f"{module_name}: {result.stderr.strip().splitlines()[-1]}")
+
+    # ხაზის ფორმატი: "import time: self [us] | cumulative | imported package"
+    per_package = defaultdict(int)
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        per_package[name.strip().split('.')[0]] += int(self_us)
+    return wall_ms, per_package
+
+
+def main(modules, top=10):
+    for module_name in modules:
+        wall_ms, per_package = import_profile(module_name)
+        total_ms = sum(per_package.values()) / 1000
+        print(f"\n{module_name}: პროცესი {wall_ms:.0f}ms, იმპორტი {total_ms:.0f}ms")
+        for name, self_us in sorted(per_package.items(), key=lambda kv: -kv[1])[:top]:
+            print(f"  {name:<20} {self_us / 1000:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    top = 10
+    if '--top' in args:
+        i = args.index('--top')
+        top = int(args[i + 1])
+        del args[i:i + 2]
+    main(args or DEFAULT_MODULES, top)
@@ -8,6 +8,7 @@ a = Analysis(
     binaries=[],
     datas=[
         ('templates', 'templates'),  # templates საქაღალდე
+        ('static', 'static'),  # ბეჭდვის CSS და ფონტები
     ],
     hiddenimports=[
         'flask',
@@ -18,6 +19,7 @@ a = Analysis(
         'docx.oxml.ns',
         'lxml',
         'lxml._elementpath',
+        'waitress',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+
+
+# ========== saved_docs დისკის ქეში ==========
+# saved_docs შეზღუდული LRU ქეშია (mtime = ბოლო გამოყენება). გამოძევებული ფაილი 0 ბაიტამდე იკვეცება:
+# სახელი დაკავებული რჩება და open_unique_file მას ახალ ანგარიშს აღარ მისცემს, შინაარსი კი მოთხოვნისას
+# შენახული შედეგებიდან აღდგება. evictable(names) აბრუნებს მათ, ვისი აღდგენაც შესაძლებელია -
+# დანარჩენი (მაგ. შედეგების შენახვამდე შექმნილი) ფაილები არასდროს იშლება
+
+EVICT_BATCH = 100
+
+
+class DocCache:
+    def __init__(self, folder, max_bytes, evictable):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.evictable = evictable
+        self.lock = threading.Lock()
+        self.total = None  # პირველ შემოწმებაზე ითვლება; სხვა პროცესების ჩაწერებს scan() ასწორებს
+
+    def path(self, name):
+        if not name or name.startswith('.') or os.path.basename(name) != name:
+            return None
+        return os.path.join(self.folder, name)
+
+    def get(self, name):
+        path = self.path(name)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if not data:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, name, data):
+        path = self.path(name)
+        # ერთი ფაილის ერთდროული აღდგენისას (სხვა ნაკადი/worker) თითოეული საკუთარ დროებით ფაილში წერს
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.added(len(data))
+
+    def added(self, size):
+        with self.lock:
+            if self.total is not None:
+                self.total += size
+        return self.enforce()
+
+    def scan(self):
+        entries = []
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.docx'):
+                    st = entry.stat()
+                    if st.st_size:
+                        entries.append((st.st_mtime, entry.name, st.st_size))
+        return sorted(entries)
+
+    def enforce(self):
+        # ლიმიტის ფარგლებში სკანირება არ ხდება; გადაჭარბებისას - ყველაზე ძველიდან, პარტიებად
+        with self.lock:
+            if self.total is not None and self.total <= self.max_bytes:
+                return 0
+            entries = self.scan()
+            self.total = sum(size for _, _, size in entries)
+            evicted = 0
+            for i in range(0, len(entries), EVICT_BATCH):
+                if self.total <= self.max_bytes:
+                    break
+                batch = entries[i:i + EVICT_BATCH]
+                allowed = self.evictable([name for _, name, _ in batch])
+                for _, name, size in batch:
+                    if self.total <= self.max_bytes:
+                        break
+                    if name not in allowed:
+                        continue
+                    try:
+                        open(os.path.join(self.folder, name), 'wb').close()
+                    except OSError:
+                        continue
+                    self.total -= size
+                    evicted += 1
+            return evicted
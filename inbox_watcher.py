@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import persist_queue
+
+
+# ========== შემოსული ფაილების საქაღალდე ==========
+# ანალიზატორის ექსპორტი საქაღალდეში ვარდება და ავტომატურად მუშავდება. ცვლილებებს watchdog
+# (Linux-ზე inotify, Windows-ზე ReadDirectoryChangesW) ამჩნევს; თუ დაყენებული არ არის, საქაღალდე
+# interval წამში ერთხელ მოწმდება. ფაილი მუშავდება მხოლოდ მაშინ, როცა ზომა და mtime settle წამი აღარ იცვლება
+
+RESCAN_SECONDS = 30  # watchdog-ის დროსაც - გამოტოვებული მოვლენის შემთხვევისთვის
+LEDGER_NAME = '.processed.jsonl'
+
+
+def file_key(path):
+    # იდემპოტენტურობის გასაღები შინაარსიდან: იგივე ექსპორტი სხვა სახელითაც მეორედ არ დარეგისტრირდება
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def start_observer(folder, wake):
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class WakeHandler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            wake.set()
+
+    observer = Observer()
+    observer.schedule(WakeHandler(), folder, recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
+class InboxWatcher:
+    # process(path, checkpoint) -> dict აბრუნებს შედეგს ან აგდებს გამონაკლისს; დამუშავებული ფაილი processed/-ში,
+    # წარუმატებელი failed/-ში გადადის (მიზეზით <სახელი>.error ფაილში). PersistQueue შეზღუდულია: როცა
+    # max_backlog ფაილი უკვე რიგშია, სკანირება ჩერდება და ახალი ფაილები დისკზე ელოდება.
+    # ჟურნალში ფაილის მდგომარეობა (started -> registering -> done | failed) დამუშავებამდე იწერება;
+    # checkpoint(**info) რეგისტრაციის წინ იძახება, recover(entry) კი გადაწყვეტს, შესრულდა თუ არა
+    # ავარიით შეწყვეტილი რეგისტრაცია (შედეგი) თუ ფაილი თავიდან უნდა დამუშავდეს (None)
+    def __init__(self, folder, process, workers=2, max_backlog=8, interval=1.0, settle=1.0, recover=None):
+        self.folder = folder
+        self.process = process
+        self.recover = recover
+        self.interval = interval
+        self.settle = settle
+        self.queue = persist_queue.PersistQueue(workers=workers, max_backlog=max_backlog)
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.seen = {}
+        self.in_flight = set()
+        self.keys = {}
+        self.claims = set()
+        self.observer = None
+        self.thread = None
+
+    @property
+    def ledger_path(self):
+        return os.path.join(self.folder, LEDGER_NAME)
+
+    def load_ledger(self):
+        if not os.path.exists(self.ledger_path):
+            return
+        with open(self.ledger_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # შეწყვეტილი ჩაწერის ბოლო სტრიქონი
+                self.keys[entry['key']] = entry
+
+    def remember(self, key, path, status, **info):
+        entry = {"key": key, "file": os.path.basename(path), "status": status,
+                 "at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **info}
+        with self.lock:
+            with open(self.ledger_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.keys[key] = entry
+        return entry
+
+    def move(self, path, subfolder):
+        target_dir = os.path.join(self.folder, subfolder)
+        name = os.path.basename(path)
+        target = os.path.join(target_dir, name)
+        if os.path.exists(target):
+            target = os.path.join(target_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{name}")
+        os.replace(path, target)
+        return target
+
+    def report_failure(self, path, target, error):
+        # მიზეზი failed/-ში ფაილის გვერდით (<სახელი>.error) და კონსოლში - რიგის სტატუსი შიდაა
+        message = f"{type(error).__name__}: {error}"
+        print(f"❌ {os.path.basename(path)}: {message}")
+        try:
+            with open(target + '.error', 'w', encoding='utf-8') as f:
+                f.write(f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+        except OSError:
+            pass
+
+    def handle(self, path):
+        try:
+            key = file_key(path)
+            with self.lock:
+                if key in self.claims:
+                    # იგივე შინაარსი ახლა სხვა ნაკადში მუშავდება - ფაილი შემდეგ სკანირებაზე დამუშავდება
+                    return {"deferred": True}
+                self.claims.add(key)
+            try:
+                previous = self.keys.get(key)
+                if previous is not None and previous.get("status") == "registering" and self.recover is not None:
+                    result = self.recover(previous)
+                    if result is not None:
+                        previous = self.remember(key, previous["file"], "done", **result)
+                # ძველ ჟურნალში სტატუსი არ იწერებოდა - იქ ყველა ჩანაწერი დასრულებულია
+                if previous is not None and previous.get("status", "done") == "done":
+                    self.move(path, 'processed')
+                    return {"duplicate_of": previous['file']}
+                if previous is not None:
+                    print(f"↻ {os.path.basename(path)}: წინა დამუშავება ({previous['status']}) არ დასრულდა - თავიდან")
+                self.remember(key, path, "started")
+                try:
+                    result = self.process(path, lambda **info: self.remember(key, path, "registering", **info)) or {}
+                except Exception as e:
+                    self.remember(key, path, "failed", error=str(e))
+                    self.report_failure(path, self.move(path, 'failed'), e)
+                    raise
+                self.remember(key, path, "done", **result)
+            finally:
+                with self.lock:
+                    self.claims.discard(key)
+            self.move(path, 'processed')
+            return result
+        finally:
+            with self.lock:
+                self.in_flight.discard(path)
+            self.wake.set()
+
+    def scan(self):
+        now = time.time()
+        present = set()
+        unsettled = False
+        with os.scandir(self.folder) as entries:
+            candidates = sorted((e for e in entries if e.is_file() and not e.name.startswith('.')),
+                                key=lambda e: e.name)
+        for entry in candidates:
+            path = entry.path
+            with self.lock:
+                if path in self.in_flight:
+                    continue
+            present.add(path)
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            if self.seen.get(path) != signature or now - st.st_mtime < self.settle:
+                # ანალიზატორი ფაილს ჯერ კიდევ წერს
+                self.seen[path] = signature
+                unsettled = True
+                continue
+            del self.seen[path]
+            with self.lock:
+                self.in_flight.add(path)
+            # გადავსებულ რიგზე აქ ელოდება - ეს არის backpressure
+            self.queue.submit(self.handle, path, file=entry.name)
+            if self.stopped.is_set():
+                break
+        for path in set(self.seen) - present:
+            del self.seen[path]
+        return unsettled
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                unsettled = self.scan()
+            except OSError as e:
+                print(f"⚠️  {self.folder}: {e}")
+                unsettled = False
+            timeout = self.interval if self.observer is None or unsettled else RESCAN_SECONDS
+            self.wake.wait(timeout)
+            self.wake.clear()
+
+    def start(self):
+        for subfolder in ('', 'processed', 'failed'):
+            os.makedirs(os.path.join(self.folder, subfolder), exist_ok=True)
+        self.load_ledger()
+        self.observer = start_observer(self.folder, self.wake)
+        mode = 'watchdog' if self.observer is not None else f'polling {self.interval:g}s'
+        print(f"📂 შემოსული ფაილები: {self.folder} ({mode})")
+        self.thread = threading.Thread(target=self.run, name='inbox-watcher', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+        if self.observer is not None:
+            self.observer.stop()
+        if self.thread is not None:
+            self.thread.join()
+        self.queue.shutdown()
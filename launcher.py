@@ -0,0 +1,38 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import webbrowser
+
+
+# ========== მზადყოფნაზე დაფუძნებული გაშვება ==========
+# ბრაუზერი იხსნება მაშინვე, როცა /health პასუხობს 200-ით - ფიქსირებული დაყოვნებების გარეშე
+
+def wait_until_ready(url, timeout=60, interval=0.05):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/health', timeout=1) as response:
+                if response.status == 200:
+                    return json.load(response)
+        except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError):
+            pass
+        time.sleep(interval)
+    return None
+
+
+def open_when_ready(url, started_at, timeout=60, open_browser=True):
+    def run():
+        health = wait_until_ready(url, timeout)
+        if health is None:
+            print(f"⚠️  სერვერი {timeout} წამში არ გამზადდა: {url}")
+            return
+        print(f"✅ სერვერი მზადაა {time.perf_counter() - started_at:.2f} წამში "
+              f"(warm-up: {health.get('warm_up_seconds', 0):.2f} წ.)")
+        if open_browser:
+            webbrowser.open(url)
+
+    thread = threading.Thread(target=run, name='launcher', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,89 @@
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = 'word/document.xml'
+MARKER_OPEN, MARKER_CLOSE = '⟦', '⟧'
+MARKER_RE = re.compile(f'{MARKER_OPEN}([^{MARKER_CLOSE}]+){MARKER_CLOSE}')
+# მარკერის შემცველ w:t-ს სჭირდება xml:space="preserve", რომ მნიშვნელობის ირგვლივ ჰარები არ დაიკარგოს
+MARKER_TEXT_RE = re.compile(f'<w:t>([^<]*{MARKER_OPEN}[^<]*)</w:t>')
+# XML 1.0-ში დაუშვებელი საკონტროლო სიმბოლოები
+INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class MarkerForm(dict):
+    # ფორმის ნაცვლად გადაეცემა build_*_document-ს: ყოველი ველი თავისივე მარკერს აბრუნებს
+    def get(self, key, default=None):
+        return f'{MARKER_OPEN}{key}{MARKER_CLOSE}'
+
+
+def text_to_runs(value):
+    # python-docx-ის მსგავსად: \t -> <w:tab/>, \r და \n -> <w:br/>
+    value = escape(INVALID_XML_RE.sub('', value))
+    if '\t' in value or '\r' in value or '\n' in value:
+        value = value.replace('\t', '</w:t><w:tab/><w:t xml:space="preserve">')
+        value = value.replace('\r', '</w:t><w:br/><w:t xml:space="preserve">')
+        value = value.replace('\n', '</w:t><w:br/><w:t xml:space="preserve">')
+    return value
+
+
+class OoxmlTemplate:
+    def __init__(self, docx_bytes):
+        with zipfile.ZipFile(io.BytesIO(docx_bytes)) as src:
+            xml = src.read(DOCUMENT_PART).decode('utf-8')
+            # document.xml-ის გარდა ყველა ნაწილი ერთხელ იკუმშება; რენდერისას მხოლოდ document.xml ემატება
+            static = io.BytesIO()
+            with zipfile.ZipFile(static, 'w', zipfile.ZIP_DEFLATED) as dst:
+                for info in src.infolist():
+                    if info.filename != DOCUMENT_PART:
+                        dst.writestr(info.filename, src.read(info.filename))
+        self.document_xml = MARKER_TEXT_RE.sub(r'<w:t xml:space="preserve">\1</w:t>', xml)
+        self.static_zip = static.getvalue()
+
+    @classmethod
+    def from_builder(cls, builder):
+        buffer = io.BytesIO()
+        builder(MarkerForm()).save(buffer)
+        return cls(buffer.getvalue())
+
+    def render_xml(self, form_data):
+        return MARKER_RE.sub(lambda m: text_to_runs(form_data.get(m.group(1)) or ''), self.document_xml)
+
+    def render(self, form_data):
+        buffer = io.BytesIO(self.static_zip)
+        with zipfile.ZipFile(buffer, 'a', zipfile.ZIP_DEFLATED) as z:
+            z.writestr(DOCUMENT_PART, self.render_xml(form_data).encode('utf-8'))
+        return buffer.getvalue()
+
+
+def split_body(xml):
+    # (<w:body>-მდე, სხეულის შიგთავსი, ბოლო w:sectPr, </w:body>-დან)
+    start = xml.index('<w:body>') + len('<w:body>')
+    sect = xml.rindex('<w:sectPr')
+    end = xml.rindex('</w:body>')
+    return xml[:start], xml[start:sect], xml[sect:end], xml[end:]
+
+
+def merge_docx(documents):
+    # ერთი DOCX რამდენიმედან: ყოველი დოკუმენტი ცალკე სექციაა თავისი მინდვრებით და ახალი გვერდიდან იწყება.
+    # ყველა ერთი და იმავე python-docx შაბლონიდანაა - სტილები და სხვა ნაწილები პირველიდან აიღება
+    if len(documents) == 1:
+        return documents[0]
+    parts = []
+    for docx_bytes in documents:
+        with zipfile.ZipFile(io.BytesIO(docx_bytes)) as z:
+            parts.append(split_body(z.read(DOCUMENT_PART).decode('utf-8')))
+    # სექციის წყვეტა: წინა დოკუმენტის sectPr ცარიელი აბზაცის pPr-ში
+    body = ''.join(f'{content}<w:p><w:pPr>{sect}</w:pPr></w:p>' for _, content, sect, _ in parts[:-1])
+    head, content, sect, tail = parts[-1]
+    xml = parts[0][0] + body + content + sect + tail
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(documents[0])) as src, \
+            zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            if info.filename != DOCUMENT_PART:
+                dst.writestr(info.filename, src.read(info.filename))
+        dst.writestr(DOCUMENT_PART, xml.encode('utf-8'))
+    return buffer.getvalue()
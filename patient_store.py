@@ -0,0 +1,779 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime
+
+RECORD_FIELDS = ("id", "first_name", "last_name", "age", "test_type", "filename", "test_date", "created_at")
+# შედეგის სტრიქონი: ფორმის ველი, შაბლონის პარამეტრის კოდი (WBC, PRO, CRP...) და მნიშვნელობა ტექსტად/რიცხვად
+RESULT_FIELDS = ("test_type", "field", "code", "value", "value_num")
+
+
+def name_key(value):
+    # ძიების გასაღები - NFC + casefold (Mtavruli ასოებს Mkhedruli-ზე დაიყვანს)
+    return unicodedata.normalize("NFC", value or "").casefold().strip()
+
+
+def new_record(first_name, last_name, age, test_type, filename, test_date, results=None):
+    record = {
+        "first_name": first_name,
+        "last_name": last_name,
+        "age": age,
+        "test_type": test_type,
+        "filename": filename,
+        "test_date": test_date,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if results:
+        record["results"] = results
+    return record
+
+
+def parse_number(value):
+    # "5.1" / "5,1" -> 5.1; "Neg", "<0.5", "++" რიცხვი არ არის და მხოლოდ ტექსტად ინახება
+    try:
+        number = float(str(value).strip().replace(',', '.'))
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def split_results(record):
+    # შედეგები ჩანაწერისგან ცალკე ინახება - ძიება და რეესტრის ქეში კომპაქტური რჩება
+    record = dict(record)
+    results = record.pop("results", None) or []
+    return record, [{k: row.get(k) for k in RESULT_FIELDS} for row in results]
+
+
+def matches(record, query):
+    return query in name_key(record["last_name"]) or query in name_key(record["first_name"])
+
+
+# ========== ფაილის ჩაკეტვა (რამდენიმე პროცესი / ნაკადი) ==========
+class FileLock:
+    # ექსკლუზიური ჩაკეტვა <path>.lock ფაილზე; ერთი ობიექტი ნაკადებს შორისაც უსაფრთხოა
+    def __init__(self, path, poll=0.05):
+        self.path = path + '.lock'
+        self.poll = poll
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.handle = None
+
+    def _acquire_os(self):
+        self.handle = open(self.path, 'a+b')
+        if os.name == 'nt':
+            import msvcrt
+            while True:
+                try:
+                    self.handle.seek(0)
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_NBLCK, 1)
+                    return
+                except OSError:
+                    time.sleep(self.poll)
+        else:
+            import fcntl
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_EX)
+
+    def _release_os(self):
+        if os.name == 'nt':
+            import msvcrt
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        self.handle.close()
+        self.handle = None
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self._acquire_os()
+            except Exception:
+                self.thread_lock.release()
+                raise
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0:
+            self._release_os()
+        self.thread_lock.release()
+
+
+def atomic_write_json(path, data):
+    # დროებით ფაილში ჩაწერა + os.replace - ავარიისას ძველი ფაილი მთელი რჩება
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def next_record_id(data):
+    # მონოტონური ID: წაშლის შემდეგაც არასდროს მეორდება
+    return max([data.get("next_id", 1)] + [p["id"] + 1 for p in data["patients"]])
+
+
+# ========== JSON ბაზა (ძველი ფორმატი) ==========
+class JsonStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = FileLock(path)
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {"patients": []}
+
+    def save(self, data):
+        atomic_write_json(self.path, data)
+
+    def files(self):
+        return [self.path]
+
+    def all(self):
+        return self.load()["patients"]
+
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    def add_many(self, records):
+        # ერთი ჩატვირთვა და ერთი ატომური ჩაწერა მთელ პაკეტზე
+        with self.lock:
+            db = self.load()
+            first_id = next_record_id(db)
+            pairs = [split_results(r) for r in records]
+            records = [{"id": first_id + i, **{k: v for k, v in r.items() if k != "id"}}
+                       for i, (r, _) in enumerate(pairs)]
+            db["patients"].extend(records)
+            results = db.setdefault("results", {})
+            for record, (_, rows) in zip(records, pairs):
+                if rows:
+                    results[str(record["id"])] = rows
+            db["next_id"] = first_id + len(records)
+            self.save(db)
+        return records
+
+    def delete(self, record_id):
+        with self.lock:
+            db = self.load()
+            for i, p in enumerate(db["patients"]):
+                if p["id"] == record_id:
+                    db["next_id"] = next_record_id(db)
+                    db["patients"].pop(i)
+                    db.get("results", {}).pop(str(record_id), None)
+                    self.save(db)
+                    return p
+        return None
+
+    def results(self, record_ids):
+        stored = self.load().get("results", {})
+        return {record_id: stored.get(str(record_id), []) for record_id in record_ids}
+
+
+# ========== ჟურნალის რეჟიმი (append-only + კომპაქცია) ==========
+class JournalStore:
+    # patients_db.json რჩება სნეპშოტად, ცვლილებები კი ერთ ხაზად ემატება ჟურნალს;
+    # ყველა ჩაწერა FileLock-ით ხდება, ამიტომ რამდენიმე პროცესს შეუძლია ერთი ბაზის გამოყენება
+    def __init__(self, snapshot_path, compact_every=500, compact_interval=60):
+        self.snapshot_path = snapshot_path
+        self.journal_path = os.path.splitext(snapshot_path)[0] + '.journal'
+        self.compact_every = compact_every
+        self.compact_interval = compact_interval
+        self.lock = FileLock(snapshot_path)
+        self.wake = threading.Event()
+        with self.lock:
+            self._load()
+
+    def _stat(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def _load(self):
+        self.records, self.results_by_id, self.pending = {}, {}, 0
+        snapshot = JsonStore(self.snapshot_path).load()
+        for p in snapshot["patients"]:
+            self.records[p["id"]] = p
+        self.results_by_id = {int(k): v for k, v in snapshot.get("results", {}).items()}
+        self.next_id = next_record_id(snapshot)
+        self.pending += self._replay(self.journal_path + '.old')[0]
+        count, self.offset = self._replay(self.journal_path)
+        self.pending += count
+        self.snapshot_sig = self._stat(self.snapshot_path)
+
+    def _replay(self, path, start=0):
+        if not os.path.exists(path):
+            return 0, 0
+        count = 0
+        with open(path, 'rb') as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    entry = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    # ავარიისას ხაზი შეიძლება ნახევრად იყოს ჩაწერილი
+                    continue
+                self._apply(entry)
+                count += 1
+            return count, f.tell()
+
+    def _sync(self):
+        # ჩაკეტვის ქვეშ: სხვა პროცესების ჩანაწერების მიღება
+        journal_size = (self._stat(self.journal_path) or (0, 0))[1]
+        if self._stat(self.snapshot_path) != self.snapshot_sig or journal_size < self.offset:
+            self._load()
+        elif journal_size > self.offset:
+            count, self.offset = self._replay(self.journal_path, self.offset)
+            self.pending += count
+
+    def _apply(self, entry):
+        # იდემპოტენტური - ერთი და იგივე ჩანაწერის ხელახლა გატარება არაფერს ცვლის
+        if entry["op"] == "add":
+            self.records[entry["record"]["id"]] = entry["record"]
+            if entry.get("results"):
+                self.results_by_id[entry["record"]["id"]] = entry["results"]
+            self.next_id = max(self.next_id, entry["record"]["id"] + 1)
+        elif entry["op"] == "delete":
+            self.records.pop(entry["id"], None)
+            self.results_by_id.pop(entry["id"], None)
+
+    def _append(self, *entries):
+        line = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode('utf-8')
+        with open(self.journal_path, 'a+b') as f:
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            self.offset = f.tell()
+        for entry in entries:
+            self._apply(entry)
+        self.pending += len(entries)
+        if self.pending >= self.compact_every:
+            self.wake.set()
+
+    def files(self):
+        return [self.snapshot_path, self.journal_path, self.journal_path + '.old']
+
+    def refresh(self):
+        with self.lock:
+            self._sync()
+
+    def all(self):
+        with self.lock:
+            return sorted(self.records.values(), key=lambda x: (x["created_at"], x["id"]))
+
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    def add_many(self, records):
+        # პაკეტის ყველა ჩანაწერი ერთი write + fsync-ით ემატება ჟურნალს
+        with self.lock:
+            self._sync()
+            pairs = [split_results(r) for r in records]
+            records = [{"id": self.next_id + i, **{k: v for k, v in r.items() if k != "id"}}
+                       for i, (r, _) in enumerate(pairs)]
+            self._append(*[{"op": "add", "record": r, **({"results": rows} if rows else {})}
+                           for r, (_, rows) in zip(records, pairs)])
+        return records
+
+    def delete(self, record_id):
+        with self.lock:
+            self._sync()
+            record = self.records.get(record_id)
+            if record is None:
+                return None
+            self._append({"op": "delete", "id": record_id})
+        return record
+
+    def results(self, record_ids):
+        with self.lock:
+            self._sync()
+            return {record_id: self.results_by_id.get(record_id, []) for record_id in record_ids}
+
+    def _rotate_journal(self):
+        old_path = self.journal_path + '.old'
+        if not os.path.exists(self.journal_path):
+            return
+        if not os.path.exists(old_path):
+            os.replace(self.journal_path, old_path)
+            return
+        # წინა კომპაქცია შუაში შეწყდა - .old ჯერ სნეპშოტში არ არის, ამიტომ მას ვუმატებთ
+        with open(self.journal_path, 'rb') as src, open(old_path, 'ab') as dst:
+            dst.write(b"\n" + src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(self.journal_path)
+
+    def compact(self):
+        with self.lock:
+            self._sync()
+            if not self.pending:
+                return False
+            self._rotate_journal()
+            patients = sorted(self.records.values(), key=lambda x: x["id"])
+            results = {str(k): v for k, v in sorted(self.results_by_id.items()) if k in self.records}
+            atomic_write_json(self.snapshot_path, {"patients": patients, "results": results, "next_id": self.next_id})
+            if os.path.exists(self.journal_path + '.old'):
+                os.remove(self.journal_path + '.old')
+            self.pending, self.offset = 0, 0
+            self.snapshot_sig = self._stat(self.snapshot_path)
+        return True
+
+    def _compactor(self):
+        while True:
+            self.wake.wait(self.compact_interval)
+            self.wake.clear()
+            self.compact()
+
+    def start_compactor(self):
+        threading.Thread(target=self._compactor, name="journal-compactor", daemon=True).start()
+        return self
+
+
+# ========== SQLite ბაზა ==========
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL DEFAULT '',
+    last_name TEXT NOT NULL DEFAULT '',
+    age TEXT,
+    test_type TEXT,
+    filename TEXT,
+    test_date TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_patients_created ON patients (created_at, id);
+-- სახელით ძებნა RegistryCache-ის NameIndex-ით ხდება; ძველ ბაზებში შექმნილი ინდექსები მხოლოდ ჩაწერას ანელებდა
+DROP INDEX IF EXISTS idx_patients_last_name;
+DROP INDEX IF EXISTS idx_patients_first_name;
+CREATE TABLE IF NOT EXISTS results (
+    record_id INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    test_type TEXT,
+    code TEXT,
+    value TEXT NOT NULL,
+    value_num REAL,
+    PRIMARY KEY (record_id, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_code ON results (code, record_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+-- წაშლილი ჩანაწერების ჟურნალი: სხვა პროცესების RegistryCache მხოლოდ ცვლილებებს კითხულობს (changes)
+CREATE TABLE IF NOT EXISTS deleted_records (seq INTEGER PRIMARY KEY AUTOINCREMENT, record_id INTEGER NOT NULL);
+-- ბაზის იდენტიფიკატორი: სხვა ფაილით (მაგ. აღდგენილი ასლით) ჩანაცვლებისას ქეში თავიდან იტვირთება
+INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', lower(hex(randomblob(16))));
+"""
+
+
+class SqliteStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def files(self):
+        return [self.path, self.path + '-wal']
+
+    @staticmethod
+    def _row(row):
+        return {k: row[k] for k in RECORD_FIELDS}
+
+    def all(self):
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(RECORD_FIELDS)} FROM patients ORDER BY created_at, id").fetchall()
+        return [self._row(r) for r in rows]
+
+    def _insert(self, record):
+        record, rows = split_results(record)
+        # ფორმიდან გამოტოვებული სახელი/გვარი None-ია; JSON-ში ასე ინახებოდა, აქ ცარიელ სტრიქონად
+        record = {k: ("" if v is None and k in ("first_name", "last_name") else v)
+                  for k, v in record.items() if k in RECORD_FIELDS}
+        cur = self.conn.execute(
+            f"INSERT INTO patients ({', '.join(record)}) VALUES ({', '.join('?' * len(record))})", list(record.values()))
+        if rows:
+            self.conn.executemany(
+                f"INSERT INTO results (record_id, {', '.join(RESULT_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                [(cur.lastrowid, *(row[k] for k in RESULT_FIELDS)) for row in rows])
+        return {"id": cur.lastrowid, **{k: v for k, v in record.items() if k != "id"}}
+
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    def add_many(self, records):
+        # ერთი ტრანზაქცია: ან მთელი პაკეტი ინახება, ან არაფერი
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                records = [self._insert(r) for r in records]
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return records
+
+    def delete(self, record_id):
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(RECORD_FIELDS)} FROM patients WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("DELETE FROM results WHERE record_id = ?", (record_id,))
+                self.conn.execute("DELETE FROM patients WHERE id = ?", (record_id,))
+                self.conn.execute("INSERT INTO deleted_records (record_id) VALUES (?)", (record_id,))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return self._row(row)
+
+    def _token(self):
+        # (ბაზის იდენტიფიკატორი, ბოლო გაცემული ID, ბოლო წაშლის ნომერი) - AUTOINCREMENT-ის მრიცხველები
+        # მხოლოდ იზრდება, ჩამწერები კი BEGIN IMMEDIATE-ით რიგდებიან, ამიტომ ID-ები ამავე რიგით ჩნდება
+        generation = self.conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        counters = dict(self.conn.execute("SELECT name, seq FROM sqlite_sequence").fetchall())
+        return (generation[0] if generation else None, counters.get("patients", 0),
+                counters.get("deleted_records", 0))
+
+    def snapshot(self):
+        # ყველა ჩანაწერი და სინქრონიზაციის ტოკენი ერთი წაკითხვის ტრანზაქციიდან
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                token = self._token()
+                rows = self.conn.execute(f"SELECT {', '.join(RECORD_FIELDS)} FROM patients").fetchall()
+            finally:
+                self.conn.execute("COMMIT")
+        return token, [self._row(r) for r in rows]
+
+    def changes(self, token):
+        # token-ის შემდეგ დამატებული ჩანაწერები და წაშლილი ID-ები; None - საჭიროა სრული ჩატვირთვა
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                current = self._token()
+                if current[0] != token[0] or current[1] < token[1] or current[2] < token[2]:
+                    return None
+                added = self.conn.execute(
+                    f"SELECT {', '.join(RECORD_FIELDS)} FROM patients WHERE id > ? ORDER BY id",
+                    (token[1],)).fetchall() if current[1] > token[1] else []
+                deleted = self.conn.execute(
+                    "SELECT record_id FROM deleted_records WHERE seq > ? ORDER BY seq",
+                    (token[2],)).fetchall() if current[2] > token[2] else []
+            finally:
+                self.conn.execute("COMMIT")
+        return current, [self._row(r) for r in added], [r["record_id"] for r in deleted]
+
+    def results(self, record_ids):
+        record_ids = list(record_ids)
+        found = {record_id: [] for record_id in record_ids}
+        with self.lock:
+            # SQLite-ის პარამეტრების ლიმიტი - ნაწილ-ნაწილ
+            for i in range(0, len(record_ids), 500):
+                chunk = record_ids[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT record_id, {', '.join(RESULT_FIELDS)} FROM results "
+                    f"WHERE record_id IN ({', '.join('?' * len(chunk))}) ORDER BY record_id", chunk).fetchall()
+                for row in rows:
+                    found[row["record_id"]].append({k: row[k] for k in RESULT_FIELDS})
+        return found
+
+    def migrate_from_json(self, json_path):
+        # ერთჯერადი მიგრაცია patients_db.json-დან; JSON ფაილი ხელუხლებელი რჩება
+        with self.lock:
+            # შემოწმებაც ტრანზაქციის შიგნითაა - რამდენიმე პროცესი ერთდროულად რომ არ გადაიტანოს
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                self.conn.execute("ROLLBACK")
+                return 0
+            try:
+                patients = JsonStore(json_path).all() if os.path.exists(json_path) else []
+                # ძველი len()+1 ID-ები შეიძლება მეორდებოდეს - დუბლიკატები ბოლოს ახალ ID-ს იღებს
+                seen, duplicates = set(), []
+                for p in patients:
+                    record = {k: p.get(k) for k in RECORD_FIELDS}
+                    record["created_at"] = record["created_at"] or ""
+                    if record["id"] in seen:
+                        duplicates.append({k: v for k, v in record.items() if k != "id"})
+                        continue
+                    seen.add(self._insert(record)["id"])
+                for record in duplicates:
+                    self._insert(record)
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                                  (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return len(patients)
+
+
+# ========== სახელების ინდექსი ==========
+class NameIndex:
+    # n-გრამების (1..GRAM) ინდექსი სახელსა და გვარზე; ყოველი სია დალაგებულია (created_at, id)-ით
+    GRAM = 3
+
+    def __init__(self):
+        self.postings = {}
+        self.order = []
+
+    @staticmethod
+    def sort_key(record):
+        return (record["created_at"] or "", record["id"])
+
+    def grams(self, record):
+        grams = set()
+        for name in (name_key(record["first_name"]), name_key(record["last_name"])):
+            for n in range(1, self.GRAM + 1):
+                grams.update(name[i:i + n] for i in range(len(name) - n + 1))
+        return grams
+
+    def add(self, record):
+        key = self.sort_key(record)
+        insort(self.order, key)
+        for gram in self.grams(record):
+            insort(self.postings.setdefault(gram, []), key)
+
+    def remove(self, record):
+        key = self.sort_key(record)
+        self._discard(self.order, key)
+        for gram in self.grams(record):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                self._discard(posting, key)
+                if not posting:
+                    del self.postings[gram]
+
+    @staticmethod
+    def _discard(posting, key):
+        i = bisect_left(posting, key)
+        if i < len(posting) and posting[i] == key:
+            del posting[i]
+
+    @staticmethod
+    def _newest_first(posting, before):
+        # before - კურსორი: მხოლოდ მასზე ძველი გასაღებები
+        end = len(posting) if before is None else bisect_left(posting, before)
+        for i in range(end - 1, -1, -1):
+            yield posting[i]
+
+    def candidates(self, query, before=None):
+        # აბრუნებს (created_at, id) გასაღებებს, ახლიდან ძველისკენ
+        if not query:
+            return self._newest_first(self.order, before), False
+        if len(query) <= self.GRAM:
+            return self._newest_first(self.postings.get(query, []), before), False
+        lists = [self.postings.get(query[i:i + self.GRAM], []) for i in range(len(query) - self.GRAM + 1)]
+        # ყველაზე მოკლე სია იფილტრება; n-გრამების დამთხვევა ქვესტრიქონს არ ნიშნავს
+        return self._newest_first(min(lists, key=len), before), True
+
+
+# ========== ძიების LRU ქეში ==========
+class QueryCache:
+    # ბოლო მოთხოვნების (query, კურსორი, ლიმიტი) -> ID-ების სია; ნებისმიერი ჩაწერა ქეშს ასუფთავებს
+    def __init__(self, size=128):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        ids = self.entries.get(key)
+        if ids is not None:
+            self.entries.move_to_end(key)
+        return ids
+
+    def put(self, key, ids):
+        self.entries[key] = ids
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# ========== რეესტრის ქეში ==========
+class RegistryCache:
+    # პროცესის საერთო ქეში - დისკი მოწმდება მხოლოდ ფაილის mtime/ზომის ცვლილებისას. სხვა პროცესის
+    # ჩაწერის შემდეგ ქეშს მხოლოდ ცვლილებები ემატება/აკლდება (store.changes ან ID-ების შედარება);
+    # სრული აღდგენა - პირველ ჩატვირთვაზე ან როცა ბაზა სხვა ფაილით შეიცვალა
+    def __init__(self, store, check_interval=1.0):
+        self.store = store
+        self.check_interval = check_interval
+        self.lock = threading.RLock()
+        self.records = {}
+        self.filenames = {}
+        self.index = NameIndex()
+        self.queries = QueryCache()
+        self._sig = None
+        self._token = None
+        self._checked_at = 0.0
+
+    def signature(self):
+        sig = []
+        for path in self.store.files():
+            try:
+                st = os.stat(path)
+                sig.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append((path, None, None))
+        return tuple(sig)
+
+    def _reload(self, sig):
+        if hasattr(self.store, 'refresh'):
+            self.store.refresh()
+        if hasattr(self.store, 'snapshot'):
+            self._token, records = self.store.snapshot()
+        else:
+            records = self.store.all()
+        self.records = {p["id"]: p for p in records}
+        self.filenames = {p["filename"]: p["id"] for p in self.records.values()}
+        self.index = NameIndex()
+        for record in self.records.values():
+            self.index.add(record)
+        self.queries.clear()
+        self._sig = sig
+
+    def _sync(self, sig):
+        if self._sig is None:
+            return self._reload(sig)
+        if hasattr(self.store, 'changes'):
+            changes = self.store.changes(self._token)
+            if changes is None:
+                return self._reload(sig)
+            self._token, added, deleted = changes
+        else:
+            if hasattr(self.store, 'refresh'):
+                self.store.refresh()
+            current = {p["id"]: p for p in self.store.all()}
+            added = [p for record_id, p in current.items() if record_id not in self.records]
+            deleted = [record_id for record_id in self.records if record_id not in current]
+        for record_id in deleted:
+            self._forget(record_id)
+        for record in added:
+            # საკუთარი ჩაწერები ქეშში უკვე არის
+            if record["id"] not in self.records:
+                self._remember(record)
+        if added or deleted:
+            self.queries.clear()
+        self._sig = sig
+
+    def _remember(self, record):
+        self.records[record["id"]] = record
+        self.filenames[record["filename"]] = record["id"]
+        self.index.add(record)
+
+    def _forget(self, record_id):
+        cached = self.records.pop(record_id, None)
+        if cached is not None:
+            self.index.remove(cached)
+            if self.filenames.get(cached["filename"]) == record_id:
+                del self.filenames[cached["filename"]]
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._sig is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        sig = self.signature()
+        if sig != self._sig:
+            self._sync(sig)
+
+    def _after_write(self, sig_before):
+        # საკუთარი ჩაწერის შემდეგ ხელახლა ჩატვირთვა არ გვჭირდება,
+        # თუ მანამდე სხვა პროცესს ფაილი არ შეუცვლია
+        if sig_before == self._sig:
+            self._sig = self.signature()
+
+    def all(self):
+        with self.lock:
+            self._ensure_fresh()
+            return [self.records[record_id] for _, record_id in self.index.order]
+
+    def get(self, record_id):
+        with self.lock:
+            self._ensure_fresh()
+            return self.records.get(record_id)
+
+    def by_filename(self, filename):
+        with self.lock:
+            self._ensure_fresh()
+            record_id = self.filenames.get(filename)
+            return self.records.get(record_id) if record_id is not None else None
+
+    def add(self, record):
+        return self.add_many([record])[0]
+
+    def add_many(self, records):
+        with self.lock:
+            self._ensure_fresh()
+            sig_before = self.signature()
+            records = self.store.add_many(records)
+            for record in records:
+                self._remember(record)
+            self.queries.clear()
+            self._after_write(sig_before)
+        return records
+
+    def results(self, record_ids):
+        # შედეგები ქეშში არ ინახება - მხოლოდ მოთხოვნილი ჩანაწერებისთვის იკითხება ბაზიდან
+        return self.store.results(record_ids)
+
+    def delete(self, record_id):
+        with self.lock:
+            self._ensure_fresh()
+            sig_before = self.signature()
+            record = self.store.delete(record_id)
+            self._forget(record_id)
+            self.queries.clear()
+            self._after_write(sig_before)
+        return record
+
+    def search(self, query, limit=None, before=None):
+        with self.lock:
+            self._ensure_fresh()
+            key = (query, limit, before)
+            ids = self.queries.get(key)
+            if ids is None:
+                ids = []
+                keys, verify = self.index.candidates(query, before)
+                for _, record_id in keys:
+                    if verify and not matches(self.records[record_id], query):
+                        continue
+                    ids.append(record_id)
+                    if limit is not None and len(ids) >= limit:
+                        break
+                self.queries.put(key, ids)
+            return [self.records[record_id] for record_id in ids]
+
+
+def open_store(backend, json_path, sqlite_path):
+    if backend == 'json':
+        return JsonStore(json_path)
+    if backend == 'journal':
+        return JournalStore(json_path).start_compactor()
+    if backend == 'sqlite':
+        store = SqliteStore(sqlite_path)
+        store.migrate_from_json(json_path)
+        return store
+    raise ValueError(f"უცნობი ბაზის ტიპი: {backend}")
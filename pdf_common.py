@@ -0,0 +1,171 @@
+import functools
+import hashlib
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+# ========== საერთო PDF რესურსები ==========
+# ფონტი რეგისტრირდება ერთხელ პროცესზე, სტილები და ცხრილის სტილები ერთხელ იქმნება
+# და ყველა PDF-ში გამოიყენება; reportlab იტვირთება პირველი გამოყენებისას
+
+def get_static_folder():
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'static')
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+FONT_PATH = os.path.join(get_static_folder(), 'fonts', 'DejaVuSans.ttf')
+font_lock = threading.Lock()
+font_name = None
+
+
+def get_font_name():
+    global font_name
+    with font_lock:
+        if font_name is None:
+            if os.path.exists(FONT_PATH):
+                from reportlab.pdfbase import pdfmetrics
+                from reportlab.pdfbase.ttfonts import TTFont
+                pdfmetrics.registerFont(TTFont('Georgian', FONT_PATH))
+                font_name = 'Georgian'
+            else:
+                font_name = 'Helvetica'
+        return font_name
+
+
+@functools.lru_cache(maxsize=None)
+def get_styles():
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib import colors
+    name = get_font_name()
+    return {
+        'georgian': ParagraphStyle('Georgian', fontName=name, fontSize=10, leading=14),
+        'header': ParagraphStyle('GeorgianHeader', fontName=name, fontSize=14, alignment=1,
+                                 textColor=colors.darkgreen, spaceAfter=6),
+        'title': ParagraphStyle('GeorgianTitle', fontName=name, fontSize=12, alignment=1, spaceAfter=12),
+        'sub': ParagraphStyle('Sub', fontName=name, fontSize=9, alignment=1),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def table_style(header_color, center_columns, padding=None, valign=True):
+    # ერთი TableStyle ყოველ პარამეტრთა კომბინაციაზე - Table.setStyle მხოლოდ კითხულობს ბრძანებებს
+    from reportlab.platypus import TableStyle
+    from reportlab.lib import colors
+    commands = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(header_color)),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('FONTNAME', (0, 0), (-1, -1), get_font_name()),
+    ]
+    commands += [('ALIGN', (col, 1), (col, -1), 'CENTER') for col in center_columns]
+    if valign:
+        commands.append(('VALIGN', (0, 0), (-1, -1), 'MIDDLE'))
+    if padding is not None:
+        commands += [('TOPPADDING', (0, 0), (-1, -1), padding), ('BOTTOMPADDING', (0, 0), (-1, -1), padding)]
+    return TableStyle(commands)
+
+
+def warm_up():
+    # python-docx და reportlab ფონურად იტვირთება, სერვერი კი უკვე უსმენს
+    import docx.oxml  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+    get_styles()
+
+
+# ========== PDF ქეში ==========
+class PdfCache:
+    # კონტენტით მისამართებადი LRU: გასაღები = ფორმის ნორმალიზებული მონაცემების sha256;
+    # განმეორებითი ბეჭდვა და წინასწარი ნახვა PDF-ს თავიდან აღარ აგებს
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    @staticmethod
+    def normalize(form_data):
+        # ცარიელი და გამოტოვებული ველი PDF-ში ერთნაირად ჩანს - ორივე ერთ გასაღებს იძლევა
+        return {k: v.strip() for k, v in form_data.items() if isinstance(v, str) and v.strip()}
+
+    @staticmethod
+    def key(kind, normalized):
+        payload = json.dumps([kind, normalized], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            pdf = self.items.get(key)
+            if pdf is not None:
+                self.items.move_to_end(key)
+            return pdf
+
+    def put(self, key, pdf):
+        with self.lock:
+            if key in self.items:
+                self.size -= len(self.items.pop(key))
+            self.items[key] = pdf
+            self.size += len(pdf)
+            while self.size > self.max_bytes and len(self.items) > 1:
+                _, old = self.items.popitem(last=False)
+                self.size -= len(old)
+
+    def get_or_build(self, kind, form_data, build):
+        # PDF ნორმალიზებული მონაცემებიდან იგება, რომ შინაარსი ზუსტად შეესაბამებოდეს გასაღებს
+        normalized = self.normalize(form_data)
+        key = self.key(kind, normalized)
+        pdf = self.get(key)
+        if pdf is None:
+            pdf = build(normalized)
+            self.put(key, pdf)
+        return pdf
+
+
+# ========== PDF-ების დროებითი საცავი ==========
+class BlobStore:
+    # დაბეჭდვის გვერდი PDF-ს base64-ით აღარ ატარებს: ბაიტები აქ ინახება ttl წამით
+    # და /pdf/<token>-ით მიეწოდება; ტოკენი შემთხვევითია და გამოცნობა შეუძლებელია
+    def __init__(self, ttl=300, max_items=256):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+
+    def _expire(self, now):
+        while self.items:
+            token, (expires, _) = next(iter(self.items.items()))
+            if expires > now and len(self.items) <= self.max_items:
+                break
+            del self.items[token]
+
+    def put(self, data):
+        token = secrets.token_urlsafe(16)
+        with self.lock:
+            now = time.monotonic()
+            self.items[token] = (now + self.ttl, data)
+            self._expire(now)
+        return token
+
+    def get(self, token):
+        with self.lock:
+            self._expire(time.monotonic())
+            entry = self.items.get(token)
+            return entry[1] if entry is not None else None
+
+
+def pdf_response(blobs, token):
+    from flask import abort, Response
+    pdf = blobs.get(token)
+    if pdf is None:
+        abort(404)
+    # შინაარსი ტოკენზე არასდროს იცვლება - ბრაუზერი მას ttl-ის განმავლობაში ქეშიდან იღებს
+    return Response(pdf, mimetype='application/pdf', headers={
+        'Cache-Control': f'private, max-age={blobs.ttl}, immutable',
+        'ETag': f'"{token}"',
+        'Content-Disposition': 'inline; filename="report.pdf"',
+    })
@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+STATUS_MAX_AGE = 24 * 3600  # დაღუპული worker-ის დარჩენილი სტატუს-ფაილები ამის შემდეგ იშლება
+
+
+# ========== ფონური შენახვის რიგი ==========
+class PersistQueue:
+    # DOCX-ის ჩაწერა და რეესტრში რეგისტრაცია ხდება ფონურ ნაკადებში;
+    # რიგი შეზღუდულია - გადავსებისას submit ელოდება თავისუფალ ადგილს.
+    # status_folder (ფუნქცია, რომელიც საქაღალდეს ან None-ს აბრუნებს) - სამუშაოს სტატუსი იქ <job_id>.json
+    # ფაილადაც იწერება, რომ --workers რეჟიმში /persist/<job_id> ნებისმიერმა worker-მა უპასუხოს
+    def __init__(self, workers=2, max_backlog=64, keep_finished=1000, status_folder=None):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='persist')
+        self.slots = threading.BoundedSemaphore(max_backlog)
+        self.keep_finished = keep_finished
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.futures = set()
+        self.closed = False
+        self.status_folder = status_folder
+        self.pruned_at = 0
+
+    def submit(self, fn, *args, **meta):
+        if self.closed:
+            raise RuntimeError("შენახვის რიგი დახურულია")
+        self.slots.acquire()
+        job_id = uuid.uuid4().hex
+        job = {"status": "pending", **meta}
+        with self.lock:
+            self.jobs[job_id] = job
+        self._publish(job_id, job)
+        try:
+            future = self.executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            self.slots.release()
+            raise
+        with self.lock:
+            self.futures.add(future)
+        future.add_done_callback(self._discard)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        try:
+            result = fn(*args) or {}
+            update = {"status": "done", **result}
+        except Exception as e:
+            update = {"status": "error", "error": str(e)}
+        finally:
+            self.slots.release()
+        with self.lock:
+            self.jobs[job_id].update(update)
+            self.jobs.move_to_end(job_id)
+            job = dict(self.jobs[job_id])
+            trimmed = self._trim()
+        self._publish(job_id, job)
+        for old_id in trimmed:
+            self._unpublish(old_id)
+
+    def _discard(self, future):
+        with self.lock:
+            self.futures.discard(future)
+
+    def _trim(self):
+        finished = [k for k, v in self.jobs.items() if v["status"] != "pending"]
+        trimmed = finished[:max(0, len(finished) - self.keep_finished)]
+        for job_id in trimmed:
+            del self.jobs[job_id]
+        return trimmed
+
+    def _status_path(self, job_id):
+        if self.status_folder is None or not (len(job_id) == 32 and job_id.isalnum()):
+            return None
+        folder = self.status_folder()
+        return os.path.join(folder, job_id + '.json') if folder is not None else None
+
+    def _publish(self, job_id, job):
+        # სტატუს-ფაილი დამხმარეა: ჩაწერის შეცდომა შენახვას არ აჩერებს, ამ worker-ში სტატუსი მეხსიერებაშიც არის
+        path = self._status_path(job_id)
+        if path is None:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        if time.time() - self.pruned_at > 3600:
+            self.pruned_at = time.time()
+            self._prune(os.path.dirname(path))
+
+    def _unpublish(self, job_id):
+        path = self._status_path(job_id)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _prune(self, folder):
+        cutoff = time.time() - STATUS_MAX_AGE
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        # სამუშაო სხვა worker-ში შესრულდა
+        path = self._status_path(job_id)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def pending(self):
+        with self.lock:
+            return sum(1 for v in self.jobs.values() if v["status"] == "pending")
+
+    def flush(self, timeout=None):
+        with self.lock:
+            futures = list(self.futures)
+        for future in futures:
+            future.exception(timeout=timeout)
+
+    def shutdown(self):
+        # პროგრამის დახურვისას ყველა დაწყებული შენახვა სრულდება
+        self.closed = True
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,26 @@
+import os
+import shutil
+import sys
+
+# Jinja შაბლონების წინასწარი კომპილაცია Python მოდულებად (ერთ-საქაღალდიანი build-ისთვის)
+# გაშვება: python precompile_templates.py [სამიზნე საქაღალდე]; PremiumMedi-onedir.spec თავად იძახებს
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TARGET = os.path.join(BASE_DIR, 'compiled_templates')
+
+
+def compile_templates(target=DEFAULT_TARGET):
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    import app
+
+    # აპლიკაციის საკუთარი jinja_env - იგივე ფილტრები და autoescape, რაც გაშვებისას
+    shutil.rmtree(target, ignore_errors=True)
+    app.app.jinja_env.compile_templates(target, zip=None, ignore_errors=False)
+    return sorted(os.listdir(target))
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TARGET
+    compiled = compile_templates(target)
+    print(f"✅ {len(compiled)} შაბლონი კომპილირებულია: {target}")
@@ -0,0 +1,106 @@
+import re
+
+
+# ========== შედეგების დინამიკა ==========
+# პაციენტის ვიზიტები ერთ (ვიზიტი × პარამეტრი) მატრიცაში იკრიბება; სერიები, წინა ვიზიტთან ცვლილება
+# და ნორმიდან გადახრა სვეტებზე ვექტორულად ითვლება, ამიტომ ასობით ვიზიტიც მილიწამებში მუშავდება
+
+RANGE_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*-\s*(\d+(?:[.,]\d+)?)')
+SINGLE_RE = re.compile(r'^\s*(\d+(?:[.,]\d+)?)\s*%?\s*$')
+
+
+def get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("დინამიკის გამოთვლას სჭირდება numpy: pip install numpy")
+    return numpy
+
+
+def to_float(text):
+    return float(text.replace(',', '.'))
+
+
+def parse_range(text):
+    # "მ. 140-174; ქ. 120-174" -> (120.0, 174.0): სქესი ჩანაწერში არ ინახება, ამიტომ ორივე ნორმის საზღვრები;
+    # "0%" -> (0.0, 0.0); "მ. - ; ქ. -" -> ნორმა უცნობია
+    pairs = [(to_float(a), to_float(b)) for a, b in RANGE_RE.findall(text or '')]
+    if pairs:
+        return min(low for low, _ in pairs), max(high for _, high in pairs)
+    match = SINGLE_RE.match(text or '')
+    if match:
+        value = to_float(match.group(1))
+        return value, value
+    return None, None
+
+
+def parameter(test_type, code, name, unit, reference_range):
+    low, high = parse_range(reference_range)
+    return {"test_type": test_type, "code": code, "parameter": name, "unit": unit,
+            "reference_range": reference_range, "low": low, "high": high}
+
+
+def column(values, present):
+    # NaN -> None (JSON null)
+    return [float(v) if p else None for v, p in zip(values.tolist(), present.tolist())]
+
+
+def compute_trends(visits, rows_by_id, parameters):
+    # visits - ქრონოლოგიურად; rows_by_id - registry.results(); აბრუნებს (ვიზიტები მნიშვნელობებით, სერიები)
+    np = get_numpy()
+    columns = {(p["test_type"], p["code"]): j for j, p in enumerate(parameters)}
+    values = np.full((len(visits), len(parameters)), np.nan)
+    for i, visit in enumerate(visits):
+        for row in rows_by_id.get(visit["id"], ()):
+            j = columns.get((row["test_type"], row["code"]))
+            if j is not None and row["value_num"] is not None:
+                values[i, j] = row["value_num"]
+
+    present = ~np.isnan(values)
+    keep = present.any(axis=1)
+    visits = [v for v, k in zip(visits, keep.tolist()) if k]
+    values, present = values[keep], present[keep]
+    if not visits:
+        return [], []
+
+    # წინა ვიზიტი, სადაც პარამეტრი გაიზომა: შევსებული სტრიქონების ინდექსების კუმულატიური მაქსიმუმი
+    rows, cols = np.arange(len(visits))[:, None], np.arange(len(parameters))
+    last_seen = np.maximum.accumulate(np.where(present, rows, -1), axis=0)
+    previous = np.vstack([np.full((1, len(parameters)), -1), last_seen[:-1]])
+    deltas = np.where(previous >= 0, values - values[np.maximum(previous, 0), cols], np.nan)
+
+    low = np.array([np.nan if p["low"] is None else p["low"] for p in parameters])
+    high = np.array([np.nan if p["high"] is None else p["high"] for p in parameters])
+    flags = np.where(values < low, -1, np.where(values > high, 1, 0))  # NaN-თან შედარება ყოველთვის False-ია
+
+    counts = present.sum(axis=0)
+    filled = np.where(present, values, 0.0)
+    lo = np.where(present, values, np.inf).min(axis=0)
+    hi = np.where(present, values, -np.inf).max(axis=0)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    scaled = np.where(hi > lo, (filled - lo) / span, 0.5)  # 0..1 - გრაფიკისთვის; მუდმივი სერია შუაშია
+    out_of_range = (present & (flags != 0)).sum(axis=0)
+    latest_row = last_seen[-1].clip(0)
+    latest, latest_delta = values[latest_row, cols], deltas[latest_row, cols]
+    latest_flag = flags[latest_row, cols]
+
+    series = []
+    for j, p in enumerate(parameters):
+        if not counts[j]:
+            continue
+        mask = present[:, j]
+        series.append({
+            **p,
+            "values": column(values[:, j], mask),
+            "deltas": column(deltas[:, j], mask & (previous[:, j] >= 0)),
+            "flags": [int(f) if m else None for f, m in zip(flags[:, j].tolist(), mask.tolist())],
+            "scaled": column(scaled[:, j], mask),
+            "count": int(counts[j]),
+            "min": float(lo[j]),
+            "max": float(hi[j]),
+            "latest": float(latest[j]),
+            "latest_delta": None if np.isnan(latest_delta[j]) else float(latest_delta[j]),
+            "latest_flag": int(latest_flag[j]),
+            "out_of_range": int(out_of_range[j]),
+        })
+    return visits, series
@@ -0,0 +1,125 @@
+import importlib
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+
+# ========== საწარმოო WSGI სერვერი ==========
+# მშობელი პროცესი ხსნის მოსასმენ სოკეტს და გადასცემს N worker-ს;
+# თითოეულ worker-ში waitress ემსახურება მოთხოვნებს threads ნაკადით, accept-ს კი OS ანაწილებს
+
+SHUTDOWN_TIMEOUT = 30  # წამი, რომელსაც worker იღებს დაწყებული ფონური შენახვების დასასრულებლად
+
+def get_waitress_serve():
+    try:
+        from waitress import serve
+    except ImportError:
+        return None
+    return serve
+
+
+def is_worker_process():
+    # --workers N რეჟიმის worker-ები daemon პროცესებია; ერთი worker-ით სერვერი მთავარ პროცესში მუშაობს
+    return multiprocessing.current_process().daemon
+
+
+def serve_threaded(app, sock):
+    # waitress-ის გარეშე: Flask-ის (werkzeug) მრავალნაკადიანი სერვერი იმავე, უკვე მიბმულ სოკეტზე
+    from werkzeug.serving import make_server
+    host, port = sock.getsockname()[:2]
+    make_server(host, port, app, threaded=True, fd=sock.fileno()).serve_forever()
+
+
+def run_worker(module_name, sock, threads):
+    # მოდულს უნდა ჰქონდეს `app` და სურვილისამებრ `warm_up` (ფონურად, სოკეტი უკვე უსმენს)
+    # და `shutdown` (სერვერის გაჩერების შემდეგ - fork-ით შექმნილ worker-ში atexit არ სრულდება)
+    serve = get_waitress_serve()
+    module = importlib.import_module(module_name)
+    warm_up = getattr(module, 'warm_up', None)
+    if warm_up is not None:
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+    try:
+        if serve is None:
+            serve_threaded(module.app, sock)
+        else:
+            serve(module.app, sockets=[sock], threads=threads, ident='PremiumMedi')
+    finally:
+        shutdown = getattr(module, 'shutdown', None)
+        if shutdown is not None:
+            shutdown()
+
+
+def ignore_signal(signum, frame):
+    pass
+
+
+def interrupt(signum, frame):
+    # Ctrl+C კონსოლში ყველა პროცესს ეგზავნება, მშობელი კი SIGTERM-საც აგზავნის -
+    # მეორე სიგნალმა დაწყებული shutdown არ უნდა გაწყვიტოს
+    signal.signal(signal.SIGINT, ignore_signal)
+    signal.signal(signal.SIGTERM, ignore_signal)
+    raise KeyboardInterrupt
+
+
+def worker_main(module_name, sock, threads):
+    signal.signal(signal.SIGINT, interrupt)
+    signal.signal(signal.SIGTERM, interrupt)
+    try:
+        run_worker(module_name, sock, threads)
+    except KeyboardInterrupt:
+        pass
+
+
+def stop_workers(processes, timeout=SHUTDOWN_TIMEOUT):
+    # POSIX-ზე terminate() SIGTERM-ია და worker რბილად ჩერდება; Windows-ზე ის პროცესს მაშინვე კლავს,
+    # მაგრამ Ctrl+C იქ worker-ებსაც თავად მიუვიდა - ამიტომ მხოლოდ ველოდებით
+    if os.name != 'nt':
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+    deadline = time.monotonic() + timeout
+    for p in processes:
+        p.join(max(0, deadline - time.monotonic()))
+    for p in processes:
+        if p.is_alive():
+            print(f"⚠️  worker {p.pid} {timeout} წამში ვერ გაჩერდა - იძულებით ითიშება")
+            p.kill()
+            p.join()
+
+
+def serve(module_name, host='127.0.0.1', port=5000, workers=1, threads=8, on_ready=None, on_started=None):
+    # on_started - მშობელ პროცესში, worker-ების გაშვების შემდეგ: აქ დაწყებული ნაკადები და ღია ბაზა
+    # fork-ით worker-ებში აღარ გადავა
+    if get_waitress_serve() is None:
+        if workers > 1:
+            raise SystemExit("--workers რეჟიმს სჭირდება waitress: pip install waitress")
+        print("⚠️  waitress არ არის დაყენებული - გამოიყენება Flask-ის მრავალნაკადიანი სერვერი "
+              "(pip install waitress)")
+    sock = socket.create_server((host, port), backlog=128)
+    print(f"🌐 http://{host}:{port}  (workers: {workers}, threads: {threads}, pid: {os.getpid()})")
+    if on_ready is not None:
+        # სოკეტი უკვე მიბმულია - ბრაუზერის კავშირი რიგში დადგება და არ უარიყოფა
+        on_ready()
+    if workers <= 1:
+        if on_started is not None:
+            on_started()
+        run_worker(module_name, sock, threads)
+        return
+
+    processes = [multiprocessing.Process(target=worker_main, args=(module_name, sock, threads), daemon=True)
+                 for _ in range(workers)]
+    for p in processes:
+        p.start()
+    try:
+        if on_started is not None:
+            on_started()
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("\n🛑 სერვერი ჩერდება...")
+        stop_workers(processes)
+    finally:
+        sock.close()